@@ -4,18 +4,22 @@ Sort by tab activation.
 Copyright (c) 2014 - 2016 Isaac Muse <isaacmuse@gmail.com>
 License: MIT
 """
-from os.path import basename
-from TabsExtra import tab_sort_helper as tsh
 
+# Activation times change with every tab switch; always do a full sort.
+INCREMENTAL = False
+SORT_EVENTS = ('activate',)
+# Only the activation time is used when combined with other modules.
+KEY_FIELDS = 1
 
-def run(views, view_data):
+
+def run(views, view_data, context):
     """Prep data for sort."""
 
-    for v in views:
+    for v, name in zip(views, context.name_keys(views)):
         view_data.append(
             (
                 v.settings().get("tabs_extra_last_activated", 0),
-                tsh.numeric_sort(basename(v.file_name() if v.file_name() else '').lower()),
+                name,
                 v
             )
         )
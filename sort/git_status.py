@@ -0,0 +1,26 @@
+"""
+Sort by git status.
+
+Copyright (c) 2014 - 2016 Isaac Muse <isaacmuse@gmail.com>
+License: MIT
+"""
+
+# Status can change outside of Sublime (commits, checkouts, staging); always do a full sort.
+INCREMENTAL = False
+SKIP_UNCHANGED = False
+# Only the status is used when combined with other modules.
+KEY_FIELDS = 1
+
+
+def run(views, view_data, context):
+    """Prep data for sort."""
+
+    # Conflicted, modified, staged, untracked, clean, and then files outside of a repository.
+    for v, status, name in zip(views, context.git_statuses(views), context.name_keys(views)):
+        view_data.append(
+            (
+                status,
+                name,
+                v
+            )
+        )
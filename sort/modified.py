@@ -4,40 +4,26 @@ Sort by file modified time.
 Copyright (c) 2014 - 2016 Isaac Muse <isaacmuse@gmail.com>
 License: MIT
 """
-import time
-from os.path import exists, getmtime, basename
-from TabsExtra import tab_sort_helper as tsh
 
+# Saving or editing a tab changes its modified time and dirty state.
+SORT_EVENTS = ('save', 'modify')
+# Only the dirty state and modified time are used when combined with other modules.
+KEY_FIELDS = 2
 
-def run(views, view_data):
+
+def run(views, view_data, context):
     """Prep data for sort."""
 
-    for v in views:
-        file_name = v.file_name()
-        modified = -1
-        dirty = v.is_dirty()
-        if file_name is not None and exists(file_name):
-            if not dirty:
-                try:
-                    modified = getmtime(file_name)
-                except Exception:
-                    dirty = True
-        else:
-            dirty = True
+    stats = context.stat_all([context.info(v).file_name for v in views])
 
+    # Dirty files go after the saved files.  They all share the same time so that
+    # their keys stay the same between sorts and incremental placement agrees.
+    for v, st, name in zip(views, stats, context.name_keys(views)):
+        dirty = context.info(v).dirty or not st.exists
         view_data.append(
             (
-                int(dirty), modified,
-                tsh.numeric_sort(basename(v.file_name() if v.file_name() else '').lower()),
+                int(dirty), float('inf') if dirty else st.mtime,
+                name,
                 v
             )
         )
-
-    # Wait till all times are acquired and then insert a time later
-    # than the latest time for dirty files
-    current_time = time.time()
-    count = 0
-    for item in view_data:
-        if item[1] == -1:
-            view_data[count] = (item[0], current_time, item[2], item[3])
-        count += 1
@@ -4,17 +4,19 @@ Sort by name.
 Copyright (c) 2014 - 2016 Isaac Muse <isaacmuse@gmail.com>
 License: MIT
 """
-from os.path import basename
-from TabsExtra import tab_sort_helper as tsh
 
+SORT_EVENTS = ('rename',)
+# The name is the whole key.
+KEY_FIELDS = 1
 
-def run(views, view_data):
+
+def run(views, view_data, context):
     """Prep data for sort."""
 
-    for v in views:
+    for v, name in zip(views, context.name_keys(views)):
         view_data.append(
             (
-                tsh.numeric_sort(basename(v.file_name() if v.file_name() else '').lower()),
+                name,
                 v
             )
         )
@@ -4,18 +4,22 @@ Sort by path.
 Copyright (c) 2014 - 2016 Isaac Muse <isaacmuse@gmail.com>
 License: MIT
 """
-from os.path import dirname, basename
-from TabsExtra import tab_sort_helper as tsh
+from os.path import dirname
 
+SORT_EVENTS = ('rename',)
+# Only the folder is used when combined with other modules.
+KEY_FIELDS = 1
 
-def run(views, view_data):
+
+def run(views, view_data, context):
     """Prep data for sort."""
 
-    for v in views:
+    folders = context.numeric_sorts([dirname(context.info(v).file_name or '').lower() for v in views])
+    for v, folder, name in zip(views, folders, context.name_keys(views)):
         view_data.append(
             (
-                tsh.numeric_sort(dirname(v.file_name() if v.file_name() else '').lower()),
-                tsh.numeric_sort(basename(v.file_name() if v.file_name() else '').lower()),
+                folder,
+                name,
                 v
             )
         )
@@ -0,0 +1,38 @@
+"""
+Sort by project folder.
+
+Copyright (c) 2014 - 2016 Isaac Muse <isaacmuse@gmail.com>
+License: MIT
+"""
+
+SORT_EVENTS = ('rename',)
+# Only the project folder is used when combined with other modules.
+KEY_FIELDS = 1
+
+
+def run(views, view_data, context):
+    """Prep data for sort."""
+
+    outside = len(context.folders())
+    roots = []
+    paths = []
+    for v in views:
+        file_name = context.info(v).file_name
+        if file_name:
+            index, path = context.project_folder(file_name)
+            roots.append(outside if index is None else index)
+            paths.append(path.lower())
+        else:
+            # Unsaved tabs go after the tabs outside of the project.
+            roots.append(outside + 1)
+            paths.append('')
+
+    for v, root, path, name in zip(views, roots, context.numeric_sorts(paths), context.name_keys(views)):
+        view_data.append(
+            (
+                root,
+                path,
+                name,
+                v
+            )
+        )
@@ -0,0 +1,23 @@
+"""
+Sort by path relative to the project folders.
+
+Copyright (c) 2014 - 2016 Isaac Muse <isaacmuse@gmail.com>
+License: MIT
+"""
+
+SORT_EVENTS = ('rename',)
+# Only the folder is used when combined with other modules.
+KEY_FIELDS = 1
+
+
+def run(views, view_data, context):
+    """Prep data for sort."""
+
+    for v, folder, name in zip(views, context.path_keys(views), context.name_keys(views)):
+        view_data.append(
+            (
+                folder,
+                name,
+                v
+            )
+        )
@@ -5,8 +5,14 @@ Copyright (c) 2014 - 2016 Isaac Muse <isaacmuse@gmail.com>
 License: MIT
 """
 
+# Keys are relative to the current order; always do a full sort and never skip.
+INCREMENTAL = False
+SKIP_UNCHANGED = False
+# The position is the whole key.
+KEY_FIELDS = 1
 
-def run(views, view_data):
+
+def run(views, view_data, context):
     """Prep data for sort."""
 
     count = len(views)
@@ -4,43 +4,107 @@ Sort by file/buffer size.
 Copyright (c) 2014 - 2016 Isaac Muse <isaacmuse@gmail.com>
 License: MIT
 """
+import codecs
+import re
 import sublime
-from os.path import getsize, exists, basename
-from TabsExtra import tab_sort_helper as tsh
 
+# Saving or editing a tab changes its size.
+SORT_EVENTS = ('save', 'modify')
+# Only the size is used when combined with other modules.
+KEY_FIELDS = 1
 
-def run(views, view_data):
+
+# Characters encoded per chunk when measuring unsaved buffers.
+CHUNK_SIZE = 1024 * 1024
+
+RE_ENCODING = re.compile(r'.+\((.*)\)')
+
+ENCODING_MAPPING = (
+    ("with BOM", ""),
+    ("Windows", "cp"),
+    ("-", "_"),
+    (" ", "")
+)
+
+_ENCODINGS = {}
+
+
+def normalize_encoding(encoding):
+    """Convert a Sublime encoding name into a Python codec name."""
+
+    name = _ENCODINGS.get(encoding)
+    if name is None:
+        name = encoding
+        m = RE_ENCODING.match(name)
+        if m is not None:
+            name = m.group(1)
+        for item in ENCODING_MAPPING:
+            name = name.replace(item[0], item[1])
+        if name == "Undefined":
+            name = "utf_8"
+        try:
+            codecs.lookup(name)
+        except LookupError:
+            name = "utf_8"
+        _ENCODINGS[encoding] = name
+    return name
+
+
+def encoded_size(view, encoding):
+    """Count the encoded size of the buffer region by region using an incremental encoder."""
+
+    encoder = codecs.getincrementalencoder(encoding)(errors='replace')
+    end = view.size()
+    size = 0
+    start = 0
+    while start < end:
+        stop = min(start + CHUNK_SIZE, end)
+        size += len(encoder.encode(view.substr(sublime.Region(start, stop))))
+        start = stop
+    size += len(encoder.encode('', final=True))
+    return size
+
+
+def approximate_size(view, encoding):
+    """Estimate the encoded size of the buffer from its character count and the encoding width."""
+
+    width = len(codecs.encode('a', encoding))
+    if encoding.startswith(('utf_16', 'utf_32')):
+        # Drop the BOM that Python emits for the non endian specific variants.
+        width = len(codecs.encode('aa', encoding)) - width
+    return view.size() * width
+
+
+def buffer_size(view, approximate=False):
+    """Get the size of an unsaved buffer."""
+
+    encoding = normalize_encoding(view.encoding())
+    if approximate:
+        size = approximate_size(view, encoding)
+    else:
+        size = encoded_size(view, encoding)
+    if view.line_endings() == 'Windows':
+        # Each newline gains a carriage return, as wide as any other character in the encoding.
+        width = len(codecs.encode('\r\r', encoding)) - len(codecs.encode('\r', encoding))
+        size += view.rowcol(view.size())[0] * width
+    return size
+
+
+def run(views, view_data, context):
     """Prep data for sort."""
 
-    for v in views:
-        file_name = v.file_name()
-        if file_name is not None and exists(file_name):
-            size = getsize(file_name)
+    stats = context.stat_all([context.info(v).file_name for v in views])
+    approximate = bool(context.get("size_sort_approximate", False))
+
+    for v, st, name in zip(views, stats, context.name_keys(views)):
+        if st.exists:
+            size = st.size
         else:
-            import re
-            encoding = v.encoding()
-            mapping = [
-                ("with BOM", ""),
-                ("Windows", "cp"),
-                ("-", "_"),
-                (" ", "")
-            ]
-            encoding = v.encoding()
-            m = re.match(r'.+\((.*)\)', encoding)
-            if m is not None:
-                encoding = m.group(1)
-
-            for item in mapping:
-                encoding = encoding.replace(item[0], item[1])
-            if encoding == "Undefined":
-                encoding = "utf_8"
-            size = len(v.substr(sublime.Region(0, v.size())).encode(encoding))
-            if v.line_endings() == 'Windows':
-                size += v.rowcol(v.size())[0]
+            size = buffer_size(v, approximate)
         view_data.append(
             (
                 size,
-                tsh.numeric_sort(basename(v.file_name() if v.file_name() else '').lower()),
+                name,
                 v
             )
         )
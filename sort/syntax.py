@@ -4,18 +4,22 @@ Sort by syntax.
 Copyright (c) 2014 - 2016 Isaac Muse <isaacmuse@gmail.com>
 License: MIT
 """
-from os.path import basename
-from TabsExtra import tab_sort_helper as tsh
 
+# Syntax changes don't raise an event; always recompute the keys.
+SKIP_UNCHANGED = False
+# Only the syntax is used when combined with other modules.
+KEY_FIELDS = 1
 
-def run(views, view_data):
+
+def run(views, view_data, context):
     """Prep data for sort."""
 
-    for v in views:
+    syntaxes = context.numeric_sorts([context.info(v).syntax for v in views])
+    for v, syntax, name in zip(views, syntaxes, context.name_keys(views)):
         view_data.append(
             (
-                tsh.numeric_sort(v.settings().get('syntax', '')),
-                tsh.numeric_sort(basename(v.file_name() if v.file_name() else '').lower()),
+                syntax,
+                name,
                 v
             )
         )
@@ -4,18 +4,24 @@ Sort by file type.
 Copyright (c) 2014 - 2016 Isaac Muse <isaacmuse@gmail.com>
 License: MIT
 """
-from os.path import splitext, basename
-from TabsExtra import tab_sort_helper as tsh
+from os.path import splitext
 
+SORT_EVENTS = ('rename',)
+# Only the extension is used when combined with other modules.
+KEY_FIELDS = 1
 
-def run(views, view_data):
+
+def run(views, view_data, context):
     """Prep data for sort."""
 
-    for v in views:
+    parts = [splitext(context.info(v).basename.lower()) for v in views]
+    names = context.numeric_sorts([p[0] for p in parts])
+    exts = context.numeric_sorts([p[1] for p in parts])
+    for v, ext, name in zip(views, exts, names):
         view_data.append(
             (
-                tsh.numeric_sort((splitext(v.file_name())[1] if v.file_name() else '').lower()),
-                tsh.numeric_sort((splitext(basename(v.file_name()))[0] if v.file_name() else '').lower()),
+                ext,
+                name,
                 v
             )
         )
@@ -0,0 +1,167 @@
+"""Tabs git status helper."""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+GIT_CONFLICTED = 0
+GIT_MODIFIED = 1
+GIT_STAGED = 2
+GIT_UNTRACKED = 3
+GIT_CLEAN = 4
+GIT_NO_REPO = 5
+
+
+class GitStatusCache(object):
+    """
+    Shared, thread safe per repository cache of `git status`.
+
+    One `git status --porcelain=v2 -z` call is made per repository and the
+    result is reused until the repository's index changes, TabsExtra sees a
+    file being saved, or the entry is older than the TTL.
+    """
+
+    lock = threading.Lock()
+    entries = {}
+    hits = 0
+    misses = 0
+
+    @staticmethod
+    def find_root(folder):
+        """Find the root of the repository containing the folder, or `None`."""
+
+        while True:
+            if os.path.exists(os.path.join(folder, '.git')):
+                return folder
+            parent = os.path.dirname(folder)
+            if parent == folder:
+                return None
+            folder = parent
+
+    @staticmethod
+    def index_path(root):
+        """Get the path of the repository's index, following `.git` files used by worktrees and submodules."""
+
+        git_dir = os.path.join(root, '.git')
+        if os.path.isfile(git_dir):
+            try:
+                with open(git_dir, 'r') as f:
+                    content = f.read().strip()
+            except OSError:
+                return None
+            if not content.startswith('gitdir:'):
+                return None
+            git_dir = os.path.join(root, content[7:].strip())
+        return os.path.join(git_dir, 'index')
+
+    @classmethod
+    def index_mtime(cls, root):
+        """Get the modified time of the repository's index."""
+
+        path = cls.index_path(root)
+        try:
+            return os.stat(path).st_mtime_ns if path else None
+        except OSError:
+            return None
+
+    @staticmethod
+    def parse(root, output):
+        """Parse `git status --porcelain=v2 -z` output into a dictionary of normalized path to status."""
+
+        statuses = {}
+        entries = output.split('\0')
+        i = 0
+        while i < len(entries):
+            entry = entries[i]
+            i += 1
+            if not entry:
+                continue
+            kind = entry[0]
+            if kind == '?':
+                status, path = GIT_UNTRACKED, entry[2:]
+            elif kind == 'u':
+                status, path = GIT_CONFLICTED, entry.split(' ', 10)[10]
+            elif kind in ('1', '2'):
+                fields = entry.split(' ', 9 if kind == '2' else 8)
+                status = GIT_MODIFIED if fields[1][1] != '.' else GIT_STAGED
+                path = fields[-1]
+                if kind == '2':
+                    # Renames and copies are followed by the original path.
+                    i += 1
+            else:
+                continue
+            statuses[os.path.normcase(os.path.normpath(os.path.join(root, path)))] = status
+        return statuses
+
+    @staticmethod
+    def run(root, binary='git'):
+        """Run `git status` in the repository; `None` is returned if git fails."""
+
+        startupinfo = None
+        if sys.platform.startswith('win'):
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        # Don't let `git status` refresh the index as that would change its modified time.
+        env = dict(os.environ, GIT_OPTIONAL_LOCKS='0')
+        try:
+            result = subprocess.run(
+                [binary, 'status', '--porcelain=v2', '-z', '--untracked-files=all'],
+                cwd=root,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                startupinfo=startupinfo,
+                timeout=30
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if result.returncode != 0:
+            return None
+        return result.stdout.decode('utf-8', 'surrogateescape')
+
+    @classmethod
+    def get(cls, root, ttl=5.0, binary='git'):
+        """Get the statuses of the repository, from the cache if the index is unchanged and the entry is fresh."""
+
+        now = time.monotonic()
+        mtime = cls.index_mtime(root)
+        with cls.lock:
+            entry = cls.entries.get(root)
+            if entry is not None and entry[1] == mtime and now - entry[0] < ttl:
+                cls.hits += 1
+                return entry[2]
+            cls.misses += 1
+
+        output = cls.run(root, binary)
+        statuses = cls.parse(root, output) if output is not None else None
+        with cls.lock:
+            cls.entries[root] = (now, mtime, statuses)
+        return statuses
+
+    @classmethod
+    def invalidate(cls, root=None):
+        """Invalidate the given repository or the entire cache."""
+
+        with cls.lock:
+            if root is None:
+                cls.entries.clear()
+            else:
+                cls.entries.pop(root, None)
+
+    @classmethod
+    def clear(cls):
+        """Clear the cache and reset the counters."""
+
+        with cls.lock:
+            cls.entries.clear()
+            cls.hits = 0
+            cls.misses = 0
+
+    @classmethod
+    def stats(cls):
+        """Return the hit and miss counts."""
+
+        with cls.lock:
+            return {"hits": cls.hits, "misses": cls.misses, "size": len(cls.entries)}
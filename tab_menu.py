@@ -138,7 +138,7 @@ SORT_OPTIONS = '''    { "caption": "-" },
         ]
     }'''
 
-SORT_ENTRY = '            { "command": "tabs_extra_sort", "args": {"group": -1, "sort_by": "%(sort_by)s", "reverse": %(reverse)s}, "caption": "%(caption)s" }'  # noqa
+SORT_ENTRY = '            { "command": "tabs_extra_sort", "args": {"group": -1, "sort_by": %(sort_by)s, "reverse": %(reverse)s}, "caption": %(caption)s }'  # noqa
 
 ###############################
 # Override Menu Options
@@ -205,8 +205,8 @@ def get_menu(override=False):
                     for sort_entry in sort_layout:
                         sort_entries.append(
                             SORT_ENTRY % {
-                                "sort_by": sort_entry.get("module", ""),
-                                "caption": sort_entry.get("caption", ""),
+                                "sort_by": json.dumps(sort_entry.get("module", ""), ensure_ascii=False),
+                                "caption": json.dumps(sort_entry.get("caption", ""), ensure_ascii=False),
                                 "reverse": str(bool(sort_entry.get("reverse", False))).lower()
                             }
                         )
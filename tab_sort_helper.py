@@ -1,21 +1,696 @@
 """Tabs sort helper."""
-from itertools import groupby
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple
+import functools
+import inspect
+from operator import itemgetter
+import os
+import re
+import sys
+import threading
+import time
 import sublime
+from . import tab_git
 
 SETTINGS = "tabs_extra.sublime-settings"
 
+# Maximum number of strings whose natural sort keys are remembered.
+NATURAL_KEY_CACHE_SIZE = 4096
 
-def numeric_sort(text):
-    """Sort numbers in strings as actual numbers."""
+RE_NUMBERS = re.compile(r'(\d+)')
+RE_PATH_SEP = re.compile(r'[\\/]+')
 
-    if sublime.load_settings(SETTINGS).get("numeric_sort", False):
-        final_text = []
-        for digit, g in groupby(text, lambda x: x.isdigit()):
-            val = "".join(g)
-            if digit:
-                final_text.append(int(val))
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+class SortCancelled(Exception):
+    """Raised when a sort has been superseded by a newer one."""
+
+
+def get_executor():
+    """Get the shared, bounded thread pool used to gather sort keys."""
+
+    global _EXECUTOR
+
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            workers = int(sublime.load_settings(SETTINGS).get("sort_io_workers", 4))
+            _EXECUTOR = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="TabsExtraSort")
+        return _EXECUTOR
+
+
+def shutdown_executor():
+    """Shutdown the shared thread pool."""
+
+    global _EXECUTOR
+
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            _EXECUTOR = None
+
+
+FileStat = namedtuple('FileStat', ['exists', 'mtime', 'ctime', 'size'])
+
+MISSING_FILE = FileStat(False, None, None, None)
+
+
+class StatCache(object):
+    """
+    Shared, thread safe per path cache of file metadata.
+
+    Entries are dropped when TabsExtra sees the file load or save, and expire
+    after a TTL so that changes made outside of Sublime are picked up.
+    """
+
+    lock = threading.Lock()
+    entries = {}
+    hits = 0
+    misses = 0
+
+    @staticmethod
+    def stat(path):
+        """Stat the file."""
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            return MISSING_FILE
+        # `st_birthtime` is the creation time on macOS/BSD; `st_ctime` is the creation time on Windows.
+        return FileStat(True, st.st_mtime, getattr(st, 'st_birthtime', st.st_ctime), st.st_size)
+
+    @classmethod
+    def get(cls, path, ttl=2.0):
+        """Get the file's metadata, from the cache if it is still fresh."""
+
+        if path is None:
+            return MISSING_FILE
+
+        now = time.monotonic()
+        with cls.lock:
+            entry = cls.entries.get(path)
+            if entry is not None and now - entry[0] < ttl:
+                cls.hits += 1
+                return entry[1]
+            cls.misses += 1
+
+        result = cls.stat(path)
+        with cls.lock:
+            cls.entries[path] = (now, result)
+        return result
+
+    @classmethod
+    def invalidate(cls, path=None):
+        """Invalidate the given path or the entire cache."""
+
+        with cls.lock:
+            if path is None:
+                cls.entries.clear()
+            else:
+                cls.entries.pop(path, None)
+
+    @classmethod
+    def prune(cls, ttl=2.0):
+        """Drop expired entries."""
+
+        now = time.monotonic()
+        with cls.lock:
+            for path in [k for k, v in cls.entries.items() if now - v[0] >= ttl]:
+                del cls.entries[path]
+
+    @classmethod
+    def clear(cls):
+        """Clear the cache and reset the counters."""
+
+        with cls.lock:
+            cls.entries.clear()
+            cls.hits = 0
+            cls.misses = 0
+
+    @classmethod
+    def stats(cls):
+        """Return the hit and miss counts along with the hit rate."""
+
+        with cls.lock:
+            total = cls.hits + cls.misses
+            return {
+                "hits": cls.hits,
+                "misses": cls.misses,
+                "hit_rate": float(cls.hits) / total if total else 0.0,
+                "size": len(cls.entries)
+            }
+
+
+@functools.lru_cache(maxsize=NATURAL_KEY_CACHE_SIZE)
+def natural_key(text):
+    """
+    Create a natural sort key where numbers are compared as numbers.
+
+    The key alternates between text and numbers, always starting and ending
+    with text, so keys can always be compared with one another.
+    """
+
+    parts = RE_NUMBERS.split(text)
+    parts[1::2] = [int(x) for x in parts[1::2]]
+    return tuple(parts)
+
+
+def natural_keys(texts, numeric=True):
+    """Create sort keys for a list of strings at once."""
+
+    if numeric:
+        return [natural_key(t) for t in texts]
+    return list(texts)
+
+
+@functools.lru_cache(maxsize=NATURAL_KEY_CACHE_SIZE)
+def path_components(path, numeric=True):
+    """
+    Split a directory path into a tuple of sort keys, one per component.
+
+    Components are lowercased and interned so that tabs in the same tree share
+    their strings, and keys compare component by component, so siblings stay
+    grouped and comparisons stop at the first differing directory.
+    """
+
+    parts = [sys.intern(part) for part in RE_PATH_SEP.split(path.lower()) if part]
+    return tuple(natural_key(part) for part in parts) if numeric else tuple(parts)
+
+
+def numeric_sort(text, numeric=None):
+    """
+    Sort numbers in strings as actual numbers.
+
+    If `numeric` is not provided, the `numeric_sort` setting is consulted.
+    """
+
+    if numeric is None:
+        numeric = sublime.load_settings(SETTINGS).get("numeric_sort", False)
+    return natural_key(text) if numeric else text
+
+
+class ViewInfo(object):
+    """Snapshot of the view state that sort modules commonly need."""
+
+    __slots__ = ('view', 'file_name', 'basename', 'dirty', 'syntax')
+
+    def __init__(self, view):
+        """Capture the view state."""
+
+        self.view = view
+        self.file_name = view.file_name()
+        self.basename = os.path.basename(self.file_name) if self.file_name else ''
+        self.dirty = view.is_dirty()
+        self.syntax = view.settings().get('syntax', '')
+
+
+class FolderIndex(object):
+    """
+    Sorted prefix index over a list of folders.
+
+    Each folder is stored with a trailing separator in sorted order along with
+    the position of the nearest folder that contains it.  A path's innermost
+    folder is found by binary searching for the greatest prefix that is not
+    greater than the path and walking up the containing folders until one is
+    a prefix of the path.  Any folder that contains the path sorts between
+    that folder and the path, so the walk never misses the innermost match.
+    """
+
+    def __init__(self, folders):
+        """Build the index."""
+
+        self.folders = []
+        seen = {}
+        for index, folder in enumerate(folders):
+            folder = self.normalize(folder)
+            if folder not in seen:
+                seen[folder] = index
+            self.folders.append(folder)
+        self.prefixes = sorted(seen)
+        self.indexes = [seen[p] for p in self.prefixes]
+        self.parents = []
+        stack = []
+        for i, prefix in enumerate(self.prefixes):
+            while stack and not prefix.startswith(self.prefixes[stack[-1]]):
+                stack.pop()
+            self.parents.append(stack[-1] if stack else -1)
+            stack.append(i)
+
+    @staticmethod
+    def normalize(path):
+        """Normalize a path for comparison and add a trailing separator."""
+
+        return os.path.normcase(os.path.normpath(path)).rstrip(os.sep) + os.sep
+
+    def find(self, path):
+        """
+        Find the innermost folder that contains the path.
+
+        Returns the folder's index in the original list and the path relative to
+        it, or `None` and the normalized path if no folder contains the path.
+        """
+
+        path = self.normalize(path)
+        i = bisect_right(self.prefixes, path) - 1
+        while i >= 0:
+            prefix = self.prefixes[i]
+            if path.startswith(prefix):
+                return self.indexes[i], path[len(prefix):-1]
+            i = self.parents[i]
+        return None, path[:-1]
+
+
+class SortContext(object):
+    """
+    Per sort run snapshot of settings and view state.
+
+    The context is created once per sort and handed to sort modules that accept
+    a third `context` parameter so that they don't have to query Sublime for the
+    same information multiple times.  Views passed in are captured up front,
+    any other view is captured the first time it is requested.
+    """
+
+    def __init__(self, window, views=(), settings=None):
+        """Capture the settings and view info."""
+
+        if settings is None:
+            settings = sublime.load_settings(SETTINGS)
+        self.window = window
+        self.settings = {
+            "numeric_sort": bool(settings.get("numeric_sort", False)),
+            "stat_cache_ttl": float(settings.get("stat_cache_ttl", 2.0))
+        }
+        self._settings = settings
+        self.views = {v.id(): ViewInfo(v) for v in views}
+        self._folder_index = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Flag the sort as cancelled."""
+
+        self.cancelled = True
+
+    def check(self):
+        """Raise `SortCancelled` if the sort has been cancelled."""
+
+        if self.cancelled:
+            raise SortCancelled
+
+    def map(self, func, items):
+        """
+        Apply `func` to each item in the shared thread pool.
+
+        Results are returned in order.  Intended for blocking I/O such as stat
+        calls.  Remaining work is abandoned if the sort is cancelled.
+        """
+
+        self.check()
+        futures = [get_executor().submit(func, item) for item in items]
+        results = []
+        try:
+            for f in futures:
+                self.check()
+                results.append(f.result())
+        except BaseException:
+            for f in futures:
+                f.cancel()
+            raise
+        return results
+
+    def get(self, key, default=None):
+        """Get a setting from the snapshot, caching it on first access."""
+
+        if key not in self.settings:
+            self.settings[key] = self._settings.get(key, default)
+        return self.settings[key]
+
+    def info(self, view):
+        """Get the info for the given view."""
+
+        info = self.views.get(view.id())
+        if info is None:
+            info = ViewInfo(view)
+            self.views[view.id()] = info
+        return info
+
+    def stat(self, path):
+        """Get a file's metadata through the shared stat cache."""
+
+        return StatCache.get(path, self.settings["stat_cache_ttl"])
+
+    def stat_all(self, paths):
+        """Get the metadata for all the paths using the thread pool; `None` paths are treated as missing."""
+
+        return self.map(self.stat, paths)
+
+    def numeric_sort(self, text):
+        """Apply numeric sort using the snapshot setting."""
+
+        return numeric_sort(text, self.settings["numeric_sort"])
+
+    def numeric_sorts(self, texts):
+        """Apply numeric sort to a list of strings using the snapshot setting."""
+
+        return natural_keys(texts, self.settings["numeric_sort"])
+
+    def name_key(self, view):
+        """Get the common basename sort key for a view."""
+
+        return self.numeric_sort(self.info(view).basename.lower())
+
+    def name_keys(self, views):
+        """Get the common basename sort keys for a list of views."""
+
+        return self.numeric_sorts([self.info(v).basename.lower() for v in views])
+
+    def git_statuses(self, views):
+        """
+        Get the git status of each view's file.
+
+        Files are grouped by repository and `git status` is run once per
+        repository, with the repositories queried in parallel.  Each status is
+        one of the `tab_git.GIT_*` constants; files outside of a repository and unsaved
+        views are `GIT_NO_REPO`.
+        """
+
+        roots = {}
+        files = []
+        for v in views:
+            file_name = self.info(v).file_name
+            root = None
+            if file_name:
+                folder = os.path.dirname(file_name)
+                if folder not in roots:
+                    roots[folder] = tab_git.GitStatusCache.find_root(folder)
+                root = roots[folder]
+            files.append((file_name, root))
+
+        repos = sorted(set(r for r in roots.values() if r is not None))
+        ttl = float(self.get("git_status_cache_ttl", 5.0))
+        binary = self.get("git_binary", "git") or "git"
+        results = dict(zip(repos, self.map(lambda r: tab_git.GitStatusCache.get(r, ttl, binary), repos)))
+
+        statuses = []
+        for file_name, root in files:
+            repo = results.get(root) if root is not None else None
+            if repo is None:
+                statuses.append(tab_git.GIT_NO_REPO)
+            else:
+                statuses.append(repo.get(os.path.normcase(os.path.normpath(file_name)), tab_git.GIT_CLEAN))
+        return statuses
+
+    def folder_index(self):
+        """Get the prefix index of the window's project folders, built once per sort."""
+
+        if self._folder_index is None:
+            self._folder_index = FolderIndex(self.window.folders() if self.window is not None else [])
+        return self._folder_index
+
+    def folders(self):
+        """Get the window's project folders, normalized for comparison."""
+
+        return self.folder_index().folders
+
+    def project_folder(self, path):
+        """
+        Find the project folder that contains the path.
+
+        Returns the index of the innermost matching folder in `window.folders()`
+        and the path relative to it, or `None` and the path itself if the path is
+        outside of every folder.
+        """
+
+        return self.folder_index().find(path)
+
+    def path_keys(self, views):
+        """
+        Get hierarchical project relative directory keys for a list of views.
+
+        Tabs within a project folder come first, ordered by folder and then by
+        directory component; tabs outside of the project follow, ordered by
+        their absolute directory; tabs without a file come last.
+        """
+
+        numeric = self.settings["numeric_sort"]
+        keys = []
+        for v in views:
+            file_name = self.info(v).file_name
+            if not file_name:
+                keys.append((2, 0, ()))
+                continue
+            index, folder = self.project_folder(os.path.dirname(file_name))
+            if index is None:
+                keys.append((1, 0, path_components(folder, numeric)))
             else:
-                final_text.append(val)
+                keys.append((0, index, path_components(folder, numeric)))
+        return keys
+
+
+class CompositeSortModule(object):
+    """
+    Combine several sort modules into one.
+
+    Every module is run against the same sort context, so view info and file
+    metadata are gathered once, and the keys of all modules are joined into one
+    key tuple per view in the order the modules are given.  Modules usually end
+    their keys with tie-breakers such as the file name; every module but the last
+    only contributes its first `KEY_FIELDS` fields so that the following modules
+    can still break ties.  Modules without `KEY_FIELDS` contribute their whole key.
+    """
+
+    def __init__(self, modules):
+        """Store the modules."""
+
+        self.modules = modules
+        self.INCREMENTAL = all(getattr(m, 'INCREMENTAL', True) for m in modules)
+        self.SKIP_UNCHANGED = all(getattr(m, 'SKIP_UNCHANGED', True) for m in modules)
+        events = set()
+        for m in modules:
+            module_events = getattr(m, 'SORT_EVENTS', None)
+            if module_events is None:
+                events = None
+                break
+            events.update(module_events)
+        self.SORT_EVENTS = events
+
+    def run(self, views, view_data, context):
+        """Prep data for sort."""
+
+        keys = {v.id(): () for v in views}
+        last = len(self.modules) - 1
+        for i, module in enumerate(self.modules):
+            data = []
+            run_sort_module(module, views, data, context)
+            context.check()
+            fields = getattr(module, 'KEY_FIELDS', None) if i < last else None
+            for entry in data:
+                keys[entry[-1].id()] += tuple(entry[:-1] if fields is None else entry[:fields])
+        for v in views:
+            view_data.append(keys[v.id()] + (v,))
+
+
+def accepts_context(module):
+    """Check whether a sort module's `run` accepts a sort context."""
+
+    try:
+        params = inspect.signature(module.run).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    count = 0
+    for p in params:
+        if p.kind == p.VAR_POSITIONAL:
+            return True
+        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD):
+            count += 1
+    return count >= 3
+
+
+def run_sort_module(module, views, view_data, context):
+    """Run a sort module using whichever signature it supports."""
+
+    if accepts_context(module):
+        module.run(views, view_data, context)
     else:
-        final_text = text
-    return final_text
+        module.run(views, view_data)
+
+
+def longest_increasing_subsequence(seq):
+    """Return the indexes of `seq` that make up a longest strictly increasing subsequence."""
+
+    tails = []
+    tail_index = []
+    previous = [-1] * len(seq)
+    for i, value in enumerate(seq):
+        pos = bisect_left(tails, value)
+        if pos == len(tails):
+            tails.append(value)
+            tail_index.append(i)
+        else:
+            tails[pos] = value
+            tail_index[pos] = i
+        previous[i] = tail_index[pos - 1] if pos else -1
+
+    result = []
+    i = tail_index[-1] if tail_index else -1
+    while i != -1:
+        result.append(i)
+        i = previous[i]
+    return result[::-1]
+
+
+def sort_view_data(view_data):
+    """Sort the view data in ascending order of everything but the trailing view."""
+
+    if not view_data:
+        return []
+    indexes = tuple(range(0, len(view_data[0]) - 1))
+    return sorted(view_data, key=itemgetter(*indexes))
+
+
+def sort_moves(view_data, reverse=False, sorted_views=None):
+    """
+    Sort the view data and return the moves needed to realize the new order.
+
+    Each entry of `view_data` must end with its view and the entries must be in
+    the group's current order.  `sorted_views` can be provided if the data has
+    already been sorted with `sort_view_data`.  Moves are returned as
+    `(current_index, destination_index)`.
+    """
+
+    if not view_data:
+        return []
+    if sorted_views is None:
+        sorted_views = sort_view_data(view_data)
+    if reverse:
+        sorted_views = sorted_views[::-1]
+    if sorted_views == view_data:
+        return []
+    position = {x[-1].id(): index for index, x in enumerate(view_data)}
+    return minimal_moves([position[x[-1].id()] for x in sorted_views])
+
+
+def layout_moves(current, target):
+    """
+    Plan the moves that turn the current layout of groups into the target layout.
+
+    `current` and `target` are lists with one list of items per group, where
+    items are hashable tokens such as view ids and every item appears once in
+    each.  In every group, the largest set of items that already are in the
+    group and in the target relative order are left alone; every other item is
+    moved once, directly to its final group and position.  Moves are returned as
+    `(item, group, index)` and must be applied in order; `index` is the position
+    after the item has been removed from its current group.
+    """
+
+    location = {}
+    for g, items in enumerate(target):
+        for i, item in enumerate(items):
+            location[item] = (g, i)
+
+    placed = set()
+    where = {}
+    for g, items in enumerate(current):
+        stayers = []
+        for item in items:
+            where[item] = g
+            if location[item][0] == g:
+                stayers.append(item)
+        for i in longest_increasing_subsequence([location[item][1] for item in stayers]):
+            placed.add(stayers[i])
+
+    # Each item is inserted right after the previous item of its target group
+    # that is already in place, so placed items always keep their target order
+    # and end up contiguous once every other item has been moved out.
+    groups = [list(items) for items in current]
+    moves = []
+    for g, items in enumerate(target):
+        previous = None
+        for item in items:
+            if item not in placed:
+                groups[where[item]].remove(item)
+                index = groups[g].index(previous) + 1 if previous is not None else 0
+                groups[g].insert(index, item)
+                where[item] = g
+                placed.add(item)
+                moves.append((item, g, index))
+            previous = item
+    return moves
+
+
+class _PrefixCounter(object):
+    """Binary indexed tree for counting items at or before a position."""
+
+    def __init__(self, size, value=0):
+        """Create the counter with every position set to `value`."""
+
+        self.tree = [0] * (size + 1)
+        if value:
+            for i in range(1, size + 1):
+                self.tree[i] += value
+                j = i + (i & -i)
+                if j <= size:
+                    self.tree[j] += self.tree[i]
+
+    def add(self, index, delta):
+        """Add `delta` at `index`."""
+
+        index += 1
+        size = len(self.tree)
+        while index < size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index):
+        """Sum of all positions up to and including `index`."""
+
+        index += 1
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+
+def minimal_moves(order):
+    """
+    Calculate the fewest moves needed to reorder a group.
+
+    `order` is the target order expressed as the current index of each item.
+    Items that are part of the longest increasing subsequence stay put, every
+    other item is moved directly after its target predecessor.  A list of
+    `(current_index, destination_index)` tuples is returned and should be
+    applied in order.
+    """
+
+    # Each moved item ends up in a chain directly behind an item that stays put
+    # (or at the front of the group), so its position is tracked as (base, seq):
+    # the original index of that item and the position within the chain.  The
+    # destination index is then a count of what precedes it.
+    keep = set(order[i] for i in longest_increasing_subsequence(order))
+    unmoved = _PrefixCounter(len(order), 1)
+    moved = _PrefixCounter(len(order))
+    front = 0
+    chains = {}
+    moves = []
+    for i, item in enumerate(order):
+        if item in keep:
+            continue
+        unmoved.add(item, -1)
+        if i == 0:
+            base, seq = -1, 1
+        elif order[i - 1] in chains:
+            base, seq = chains[order[i - 1]]
+            seq += 1
+        else:
+            base, seq = order[i - 1], 1
+        chains[item] = (base, seq)
+        if base == -1:
+            dest = seq - 1
+            front += 1
+        else:
+            dest = front + unmoved.prefix(base) + moved.prefix(base - 1) + seq - 1
+            moved.add(base, 1)
+        moves.append((item, dest))
+    return moves
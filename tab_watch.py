@@ -0,0 +1,217 @@
+"""Tabs file watch helper."""
+import os
+import struct
+import sys
+from .tab_sort_helper import StatCache
+
+
+class PollingWatcher(object):
+    """
+    Watch files for changes by comparing their metadata.
+
+    Only `batch` files are checked per poll, in turn, so the cost of a poll is
+    bounded no matter how many files are watched.
+    """
+
+    def __init__(self, batch=1000):
+        """Initialize."""
+
+        self.batch = max(1, batch)
+        self.files = {}
+        self.order = []
+        self.position = 0
+
+    @staticmethod
+    def stamp(path):
+        """Get the part of the file's metadata that changes when it is written."""
+
+        st = StatCache.stat(path)
+        return (st.exists, st.mtime, st.size)
+
+    def watch(self, paths):
+        """Set the files to watch."""
+
+        files = {}
+        for path in paths:
+            files[path] = self.files[path] if path in self.files else self.stamp(path)
+        self.files = files
+        self.order = sorted(files)
+        self.position = 0
+
+    def poll(self):
+        """Check the next batch of files and return those that changed."""
+
+        changed = set()
+        if not self.order:
+            return changed
+        count = min(self.batch, len(self.order))
+        for _ in range(count):
+            if self.position >= len(self.order):
+                self.position = 0
+            path = self.order[self.position]
+            self.position += 1
+            stamp = self.stamp(path)
+            if stamp != self.files[path]:
+                self.files[path] = stamp
+                changed.add(path)
+        return changed
+
+    def close(self):
+        """Stop watching."""
+
+        self.watch([])
+
+
+class InotifyWatcher(object):
+    """
+    Watch the folders of files for changes with Linux's inotify.
+
+    At most `max_watches` folders are watched, preferring the folders with the
+    most files; `watch` returns the files left uncovered.  Raises `OSError` if
+    inotify is not available.
+    """
+
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ONLYDIR = 0x01000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, max_watches=256):
+        """Initialize inotify."""
+
+        if not sys.platform.startswith('linux'):
+            raise OSError('inotify is only available on Linux')
+
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'could not initialize inotify')
+        self.max_watches = max(0, max_watches)
+        self.folders = {}
+        self.descriptors = {}
+        self.files = set()
+
+    def watch(self, paths):
+        """Set the files to watch and return the files whose folders could not be watched."""
+
+        by_folder = {}
+        for path in paths:
+            by_folder.setdefault(os.path.dirname(path), []).append(path)
+        wanted = set(sorted(by_folder, key=lambda f: (-len(by_folder[f]), f))[:self.max_watches])
+
+        for folder in set(self.folders) - wanted:
+            self.libc.inotify_rm_watch(self.fd, self.folders.pop(folder))
+
+        uncovered = []
+        for folder, files in by_folder.items():
+            if folder not in self.folders and folder in wanted:
+                wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), self.MASK)
+                if wd >= 0:
+                    self.folders[folder] = wd
+            if folder not in self.folders:
+                uncovered.extend(files)
+        self.descriptors = {wd: folder for folder, wd in self.folders.items()}
+        self.files = set(paths) - set(uncovered)
+        return uncovered
+
+    def poll(self):
+        """Read the pending events and return the watched files that changed."""
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + self.EVENT.size <= len(data):
+                wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+                offset += self.EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & self.IN_Q_OVERFLOW:
+                    # Events were dropped, so anything could have changed.
+                    changed.update(self.files)
+                    continue
+                folder = self.descriptors.get(wd)
+                if folder is not None and name:
+                    path = os.path.join(folder, os.fsdecode(name))
+                    if path in self.files:
+                        changed.add(path)
+        return changed
+
+    def close(self):
+        """Stop watching."""
+
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+        self.folders = {}
+        self.descriptors = {}
+        self.files = set()
+
+
+class FileWatcher(object):
+    """
+    Watch files for changes.
+
+    Uses inotify where available for up to `max_watches` folders, and polls the
+    remaining files, `poll_batch` at a time.
+    """
+
+    def __init__(self, max_watches=256, poll_batch=1000, use_inotify=True):
+        """Initialize."""
+
+        self.inotify = None
+        if use_inotify:
+            try:
+                self.inotify = InotifyWatcher(max_watches)
+            except (OSError, AttributeError):
+                self.inotify = None
+        self.polling = PollingWatcher(poll_batch)
+
+    def watch(self, paths):
+        """Set the files to watch."""
+
+        paths = set(p for p in paths if p)
+        if self.inotify is not None:
+            paths = self.inotify.watch(paths)
+        self.polling.watch(paths)
+
+    def poll(self):
+        """Return the files that changed since the last poll."""
+
+        changed = self.polling.poll()
+        if self.inotify is not None:
+            changed |= self.inotify.poll()
+        return changed
+
+    def stats(self):
+        """Return the number of watched folders and polled files."""
+
+        return {
+            "folders": len(self.inotify.folders) if self.inotify is not None else 0,
+            "polled": len(self.polling.files)
+        }
+
+    def close(self):
+        """Stop watching."""
+
+        if self.inotify is not None:
+            self.inotify.close()
+        self.polling.close()
@@ -8,10 +8,19 @@ import sublime_plugin
 import sublime
 import time
 import sys
+import threading
 from TabsExtra import tab_menu
+from TabsExtra import tab_sort_helper
+from TabsExtra import tab_git
+from TabsExtra import tab_watch
 import os
+import fnmatch
 import functools
-from operator import itemgetter
+import re
+import bisect
+from collections import OrderedDict
+import hashlib
+import types
 import sublime_api
 
 from urllib.parse import urljoin
@@ -78,6 +87,23 @@ def sublime_format_path(pth):
     return pth.replace("\\", "/")
 
 
+def get_sort_by(module):
+    """
+    Normalize a sort entry's module value.
+
+    A sort entry can specify one module or a list of modules for a composite sort.
+    A string or a list of strings is returned; an empty string if nothing valid
+    is specified.
+    """
+
+    if isinstance(module, (list, tuple)):
+        modules = [str(m) for m in module if str(m) != ""]
+        if len(modules) == 1:
+            return modules[0]
+        return modules if modules else ""
+    return str(module) if module is not None else ""
+
+
 def is_persistent():
     """Check if sticky tabs should be persistent."""
 
@@ -92,6 +118,31 @@ def sort_on_load_save():
     )
 
 
+def compile_glob(pattern):
+    """
+    Compile a glob pattern for `match_globs`.
+
+    Patterns with a path separator are matched against the whole path, others
+    against the file's base name.  Matching is case insensitive on platforms
+    with case insensitive file systems.
+    """
+
+    pattern = pattern.replace('\\', '/')
+    flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+    return '/' in pattern, re.compile(fnmatch.translate(pattern), flags)
+
+
+def match_globs(patterns, file_name):
+    """Check if the file name matches any of the compiled glob patterns."""
+
+    name = os.path.basename(file_name)
+    file_name = file_name.replace('\\', '/')
+    for whole_path, pattern in patterns:
+        if pattern.match(file_name if whole_path else name):
+            return True
+    return False
+
+
 def close_callback_noop(did_close):
     """Callback for Sublime close API."""
 
@@ -341,138 +392,1166 @@ class TabsExtraCloseMenuCommand(sublime_plugin.WindowCommand):
                 }
             )
 
-    def is_enabled(self, mode="normal"):
-        """Check if command is enabled."""
+    def is_enabled(self, mode="normal"):
+        """Check if command is enabled."""
+
+        group = -1
+        index = -1
+        sheet = self.window.active_sheet()
+        if sheet is not None:
+            group, index = self.window.get_sheet_index(sheet)
+        return group != -1 and index != -1 and mode in ["normal", "skip_unsaved", "dismiss_unsaved"]
+
+
+class TabsExtraCloseCommand(sublime_plugin.WindowCommand):
+    """Close tab command."""
+
+    def init(self, close_type, group, index):
+        """
+        Determine which views will be targeted by close command.
+
+        Also determine which tab states need to be cleaned up.
+        """
+
+        self.persistent = is_persistent()
+        self.sheets = self.window.sheets_in_group(int(group))
+        self.target_sheet = self.sheets[index] if index < len(self.sheets) else None
+        if close_type not in ["single", "left", "right", "other", "all"]:
+            raise ValueError("Unrecognized close type of '{}'".format(close_type))
+
+        # Setup active index and group
+        active_sheet = self.window.active_sheet()
+        active_index = None
+        self.active_index = index
+        self.active_group = None
+        if active_sheet is not None:
+            active_group, active_index = self.window.get_sheet_index(active_sheet)
+            if group != active_group:
+                active_index = None
+        if active_index is not None:
+            self.active_index = active_index
+
+        # Determine targeted sheets to close and sheets to cleanup
+        if close_type == "single":
+            self.targets = [self.sheets[index]]
+            self.cleanup = bool(len(self.sheets[:index] + self.sheets[index + 1:]))
+        elif close_type == "left":
+            self.targets = self.sheets[:index]
+            self.cleanup = bool(len(self.sheets[index:]))
+        elif close_type == "right":
+            self.targets = self.sheets[index + 1:]
+            self.cleanup = bool(len(self.sheets[:index + 1]))
+        elif close_type == "other":
+            self.targets = self.sheets[:index] + self.sheets[index + 1:]
+            self.cleanup = True
+        elif close_type == "all":
+            self.targets = self.sheets[:]
+            self.cleanup = False
+
+    def can_close(self, is_sticky, is_single):
+        """Prompt user in certain scenarios if okay to close."""
+
+        is_okay = True
+        if is_sticky:
+            if not is_single:
+                is_okay = False
+        return is_okay
+
+    def run(
+        self, group=-1, index=-1,
+        close_type="single", unsaved_prompt=True, close_unsaved=True
+    ):
+        """
+        Close the specified tabs and cleanup sticky states.
+
+        With `close_batch` enabled, tabs are closed without focusing each one
+        (only tabs that will prompt to save are shown first), activation
+        bookkeeping is suspended, and focus is restored once at the end.
+        """
+
+        TabsExtraListener.extra_command_call = True
+        batch = bool(sublime.load_settings(SETTINGS).get("close_batch", False))
+        start = time.perf_counter()
+        candidates = [self.window.active_sheet()]
+        closed = 0
+
+        try:
+            if group >= 0 and index >= 0:
+                self.init(close_type, group, index)
+                candidates.append(self.target_sheet)
+
+                if not self.confirm_dismiss(self.targets, unsaved_prompt):
+                    TabsExtraListener.extra_command_call = False
+                    return
+
+                journal = []
+                closed = self.close_sheets(
+                    self.window, self.targets, close_type == "single", unsaved_prompt, close_unsaved, batch, journal
+                )
+                CloseJournal.record(self.window, journal)
+
+                if not self.persistent and self.cleanup:
+                    self.window.run_command("tabs_extra_clear_all_sticky", {"group": group})
+        except Exception:
+            pass
+
+        self.finish(batch, closed, start, candidates)
+
+    def confirm_dismiss(self, targets, unsaved_prompt):
+        """If unsaved targets will be dismissed, confirm with the user first."""
+
+        return (
+            not len(targets) or
+            unsaved_prompt or
+            all(not target.view().is_dirty() for target in targets) or
+            sublime.ok_cancel_dialog("Are you sure you want to dismiss all targeted unsaved buffers?")
+        )
+
+    def close_sheets(self, window, targets, is_single, unsaved_prompt, close_unsaved, batch, journal=None):
+        """
+        Close the target sheets of the window and return how many were closed.
+
+        If a `journal` list is given, a snapshot of each file that will be closed
+        is appended to it.  Snapshots are captured before any tab is closed so
+        that they record the original positions.
+        """
+
+        if journal is not None:
+            for s in targets:
+                v = s.view()
+                if (
+                    v is not None and v.file_name() is not None and
+                    self.can_close(v.settings().get("tabs_extra_sticky", False), is_single) and
+                    (close_unsaved or not v.is_dirty())
+                ):
+                    journal.append(TabSnapshot.capture(window, v))
+
+        closed = 0
+        TabsExtraListener.batch_close = batch
+        for s in targets:
+            v = s.view()
+            if v is not None:
+                if self.can_close(v.settings().get("tabs_extra_sticky", False), is_single):
+                    dirty = v.is_dirty()
+                    if not self.persistent:
+                        v.settings().erase("tabs_extra_sticky")
+                    if not batch or (dirty and close_unsaved and unsaved_prompt):
+                        window.focus_view(v)
+                    if not dirty or close_unsaved:
+                        closed += 1
+                        if not unsaved_prompt:
+                            v.set_scratch(True)
+                        if ST_4114:
+                            sublime_api.window_close_file(window.id(), v.id(), close_callback_noop)
+                        else:
+                            sublime_api.window_close_file(window.id(), v.id())
+                elif not self.persistent:
+                    v.settings().erase("tabs_extra_sticky")
+            else:
+                if ST_4088:
+                    if ST_4114:
+                        sublime_api.sheet_close(s.id(), close_callback_noop)
+                    else:
+                        sublime_api.sheet_close(s.id())
+                else:
+                    window.focus_sheet(s)
+                    window.run_command('close_file')
+        return closed
+
+    def finish(self, batch, closed, start, candidates):
+        """Resume activation bookkeeping and, after a batch close, restore focus once."""
+
+        TabsExtraListener.batch_close = False
+        TabsExtraListener.extra_command_call = False
+        if batch and closed:
+            self.restore_focus(self.window, candidates)
+            debug("closed %d tabs in %.2f ms" % (closed, (time.perf_counter() - start) * 1000))
+
+    def restore_focus(self, window, candidates):
+        """Focus the first candidate sheet that is still open, or else the window's active view."""
+
+        open_sheets = set(s.id() for s in window.sheets())
+        for sheet in candidates:
+            if sheet is not None and sheet.id() in open_sheets:
+                Focus.focus(window, sheet)
+                return
+        view = window.active_view()
+        if view is not None:
+            Focus.focus(window, view)
+
+
+class TabsExtraCloseAllCommand(TabsExtraCloseCommand):
+    """Close all tabs in the whole window."""
+
+    def run(self):
+        """
+        Close all tabs in window; not just the tabs in the active group.
+
+        The tabs of every group are journaled as one close operation.
+        """
+
+        TabsExtraListener.extra_command_call = True
+        batch = bool(sublime.load_settings(SETTINGS).get("close_batch", False))
+        start = time.perf_counter()
+        groups = range(self.window.num_groups())
+        candidates = [self.window.active_sheet()] + [self.window.active_sheet_in_group(g) for g in groups]
+        self.persistent = is_persistent()
+        closed = 0
+        journal = []
+
+        try:
+            for group in groups:
+                closed += self.close_sheets(
+                    self.window, self.window.sheets_in_group(group), False, True, True, batch, journal
+                )
+        except Exception:
+            pass
+        CloseJournal.record(self.window, journal)
+
+        self.finish(batch, closed, start, candidates)
+
+
+class TabsExtraCloseMatchingCommand(TabsExtraCloseCommand):
+    """Close the tabs that match all of the given predicates."""
+
+    def run(
+        self, scope="group", group=-1, patterns=None, regex=None, extensions=None, inactive_minutes=None,
+        clean_only=False, outside_project=False, unsaved_prompt=True, close_unsaved=True
+    ):
+        """
+        Close matching tabs.
+
+        `scope` can be `group` (the given or active group), `window`, or
+        `all_windows`.  A tab is closed if it matches every given predicate:
+
+        - `patterns`: glob patterns matched against the file path.
+        - `regex`: regular expression searched for in the file path.
+        - `extensions`: file extensions such as `.log`.
+        - `inactive_minutes`: the tab has not been activated for this many minutes;
+          tabs that were never activated are kept.
+        - `clean_only`: the tab has no unsaved changes.
+        - `outside_project`: the file is not within any of the window's folders.
+
+        Sticky and unsaved tabs are handled like the other close commands: sticky
+        tabs are never closed, and unsaved tabs are skipped when `close_unsaved`
+        is `false`.
+        """
+
+        try:
+            predicates = self.compile(patterns, regex, extensions, inactive_minutes, clean_only, outside_project)
+        except re.error as e:
+            sublime.error_message("TabsExtra: invalid regular expression '%s'\n\n%s" % (regex, str(e)))
+            return
+        if not predicates:
+            return
+
+        if scope == "all_windows":
+            windows = sublime.windows()
+        else:
+            windows = [self.window]
+        if scope in ("window", "all_windows"):
+            targets = [(w, g) for w in windows for g in range(w.num_groups())]
+        else:
+            targets = [(self.window, self.window.active_group() if group == -1 else int(group))]
+
+        # Evaluate the predicates in one pass over the targeted groups.
+        self.persistent = is_persistent()
+        matches = []
+        folder_indexes = {}
+        for window, g in targets:
+            if outside_project and window.id() not in folder_indexes:
+                folder_indexes[window.id()] = tab_sort_helper.FolderIndex(window.folders())
+            sheets = []
+            for sheet in window.sheets_in_group(g):
+                view = sheet.view()
+                if view is not None and all(p(view, folder_indexes.get(window.id())) for p in predicates):
+                    sheets.append(sheet)
+            if sheets:
+                matches.append((window, g, sheets))
+        if not matches:
+            return
+
+        TabsExtraListener.extra_command_call = True
+        batch = bool(sublime.load_settings(SETTINGS).get("close_batch", False))
+        start = time.perf_counter()
+        active_sheets = {w.id(): w.active_sheet() for w in set(m[0] for m in matches)}
+        closed = 0
+
+        try:
+            if not self.confirm_dismiss([s for m in matches for s in m[2]], unsaved_prompt):
+                TabsExtraListener.extra_command_call = False
+                return
+
+            journals = {}
+            for window, g, sheets in matches:
+                journal = journals.setdefault(window.id(), (window, []))[1]
+                closed += self.close_sheets(window, sheets, False, unsaved_prompt, close_unsaved, batch, journal)
+                if not self.persistent:
+                    window.run_command("tabs_extra_clear_all_sticky", {"group": g})
+            for window, journal in journals.values():
+                CloseJournal.record(window, journal)
+        except Exception:
+            pass
+
+        if batch and closed:
+            for window in set(m[0] for m in matches):
+                if window.id() != self.window.id():
+                    self.restore_focus(window, [active_sheets[window.id()]])
+        self.finish(batch, closed, start, [active_sheets.get(self.window.id(), self.window.active_sheet())])
+
+    @staticmethod
+    def compile(patterns, regex, extensions, inactive_minutes, clean_only, outside_project):
+        """Compile the predicates once so that each tab is checked cheaply."""
+
+        predicates = []
+        if patterns:
+            globs = [compile_glob(p) for p in ([patterns] if isinstance(patterns, str) else patterns)]
+            predicates.append(lambda v, f: bool(v.file_name()) and match_globs(globs, v.file_name()))
+        if regex:
+            pattern = re.compile(regex)
+            predicates.append(lambda v, f: bool(v.file_name()) and pattern.search(v.file_name()) is not None)
+        if extensions:
+            exts = set(
+                ('.' + e.lstrip('.')).lower() for e in ([extensions] if isinstance(extensions, str) else extensions)
+            )
+            predicates.append(
+                lambda v, f: bool(v.file_name()) and os.path.splitext(v.file_name())[1].lower() in exts
+            )
+        if inactive_minutes is not None:
+            cutoff = time.time() - float(inactive_minutes) * 60
+            # Tabs without a timestamp have never been seen by TabsExtra, so their age is unknown.
+            predicates.append(lambda v, f: v.settings().get("tabs_extra_last_activated", cutoff) < cutoff)
+        if clean_only:
+            predicates.append(lambda v, f: not v.is_dirty())
+        if outside_project:
+            predicates.append(lambda v, f: not v.file_name() or f.find(v.file_name())[0] is None)
+        return predicates
+
+
+class TabRecency(object):
+    """
+    Least to most recently activated order of each window's tabs.
+
+    Each window's view ids are kept in an ordered dictionary that is seeded
+    once from the activation timestamps and then kept up to date as views are
+    activated, opened, and closed, so the least recently used tabs can be found
+    without reading every view's settings.
+    """
+
+    windows = {}
+
+    @classmethod
+    def order(cls, window):
+        """Get the window's order, seeding it the first time it is needed."""
+
+        order = cls.windows.get(window.id())
+        if order is None:
+            views = window.views()
+            views.sort(key=lambda v: v.settings().get("tabs_extra_last_activated", 0))
+            order = OrderedDict((v.id(), None) for v in views)
+            cls.windows[window.id()] = order
+        return order
+
+    @classmethod
+    def touch(cls, view):
+        """Mark the view as the most recently used tab of its window."""
+
+        window = view.window()
+        if window is not None and TabBudget.budget():
+            order = cls.order(window)
+            order[view.id()] = None
+            order.move_to_end(view.id())
+
+    @classmethod
+    def remove(cls, view):
+        """Forget a closed view."""
+
+        for order in cls.windows.values():
+            order.pop(view.id(), None)
+
+    @classmethod
+    def clear(cls):
+        """Forget all windows."""
+
+        cls.windows = {}
+
+
+class TabBudget(object):
+    """
+    Close the least recently used tabs when a window or group has too many tabs.
+
+    When `tab_budget` is greater than zero and a window (or each group, with
+    `tab_budget_scope` set to `group`) has more tabs than the budget, the least
+    recently activated tabs are closed until it is within budget.  Only clean,
+    non-sticky tabs with a file are closed, and the active tab of each group is
+    kept.
+    """
+
+    pending = set()
+
+    @staticmethod
+    def budget():
+        """Get the tab budget, or zero if disabled."""
+
+        return max(0, int(sublime.load_settings(SETTINGS).get("tab_budget", 0)))
+
+    @classmethod
+    def schedule(cls, window):
+        """Check the window's budget once the current event is done."""
+
+        if window is None or not cls.budget():
+            return
+        first = not cls.pending
+        cls.pending.add(window.id())
+        if first:
+            sublime.set_timeout(cls.flush, 0)
+
+    @classmethod
+    def flush(cls):
+        """Enforce the budget of the pending windows."""
+
+        pending = cls.pending
+        cls.pending = set()
+        for window in sublime.windows():
+            if window.id() in pending:
+                cls.enforce(window)
+
+    @classmethod
+    def enforce(cls, window):
+        """Close the least recently used tabs of the window that are over budget."""
+
+        budget = cls.budget()
+        if not budget:
+            return
+
+        num_groups = window.num_groups()
+        if sublime.load_settings(SETTINGS).get("tab_budget_scope", "window") == "group":
+            excess = [len(window.views_in_group(g)) - budget for g in range(num_groups)]
+            total = sum(e for e in excess if e > 0)
+        else:
+            excess = None
+            total = len(window.views()) - budget
+        if total <= 0:
+            return
+
+        views = {v.id(): v for v in window.views()}
+        keep = set()
+        for g in range(num_groups):
+            view = window.active_view_in_group(g)
+            if view is not None:
+                keep.add(view.id())
+
+        order = TabRecency.order(window)
+        targets = []
+        stale = []
+        for view_id in order:
+            if len(targets) >= total:
+                break
+            view = views.get(view_id)
+            if view is None:
+                stale.append(view_id)
+                continue
+            if (
+                view_id in keep or
+                view.file_name() is None or
+                view.is_dirty() or
+                view.settings().get("tabs_extra_sticky", False)
+            ):
+                continue
+            if excess is not None:
+                g = window.get_view_index(view)[0]
+                if excess[g] <= 0:
+                    continue
+                excess[g] -= 1
+            targets.append(view.sheet())
+        for view_id in stale:
+            del order[view_id]
+        if not targets:
+            return
+
+        closer = TabsExtraCloseCommand(window)
+        closer.persistent = True
+        TabsExtraListener.extra_command_call = True
+        start = time.perf_counter()
+        active_sheet = window.active_sheet()
+        closed = 0
+        journal = []
+        try:
+            closed = closer.close_sheets(window, targets, False, True, False, True, journal)
+        except Exception:
+            pass
+        CloseJournal.record(window, journal)
+        closer.finish(True, closed, start, [active_sheet])
+        debug("tab budget of %d exceeded, closed %d tabs" % (budget, closed))
+
+
+class TabSnapshot(object):
+    """
+    Capture the state of tabs so they can be reopened later at the same position.
+
+    A snapshot is a small dictionary holding the file, group, index, selection,
+    scroll position, syntax, and sticky state of a tab.
+    """
+
+    pending = {}
+
+    @staticmethod
+    def capture(window, view):
+        """Capture the view's state."""
+
+        group, index = window.get_view_index(view)
+        return {
+            "file": view.file_name(),
+            "group": group,
+            "index": index,
+            "selection": [[r.a, r.b] for r in view.sel()],
+            "viewport": list(view.viewport_position()),
+            "syntax": view.settings().get("syntax"),
+            "sticky": bool(view.settings().get("tabs_extra_sticky", False)),
+            "time": time.time()
+        }
+
+    @classmethod
+    def reopen(cls, window, snapshots):
+        """
+        Reopen the snapshots at their original positions and return the views.
+
+        Snapshots are reopened in group and index order, so reopening the tabs
+        that were closed together restores their original layout.  Files that
+        are already open or no longer exist are skipped.
+        """
+
+        views = []
+        num_groups = window.num_groups()
+        active_group = window.active_group()
+        for snapshot in sorted(snapshots, key=lambda s: (s["group"], s["index"])):
+            file_name = snapshot["file"]
+            if window.find_open_file(file_name) is not None or not os.path.exists(file_name):
+                continue
+            group = min(max(snapshot["group"], 0), num_groups - 1)
+            window.focus_group(group)
+            view = window.open_file(file_name)
+            if view is None:
+                continue
+            window.set_view_index(view, group, min(snapshot["index"], len(window.views_in_group(group)) - 1))
+            if view.is_loading():
+                cls.pending[view.id()] = snapshot
+            else:
+                cls.apply(view, snapshot)
+            views.append(view)
+        window.focus_group(active_group)
+        return views
+
+    @classmethod
+    def restore(cls, window, snapshots):
+        """Reopen the snapshots, then focus the reopened tab if there was only one, or else the active tab."""
+
+        TabsExtraListener.extra_command_call = True
+        active_sheet = window.active_sheet()
+        views = []
+        try:
+            views = cls.reopen(window, snapshots)
+        except Exception:
+            pass
+        TabsExtraListener.extra_command_call = False
+        if len(views) == 1:
+            Focus.focus(window, views[0])
+        elif active_sheet is not None:
+            Focus.focus(window, active_sheet)
+        return views
+
+    @classmethod
+    def loaded(cls, view):
+        """Apply the snapshot of a reopened view once it has loaded."""
+
+        snapshot = cls.pending.pop(view.id(), None)
+        if snapshot is not None:
+            cls.apply(view, snapshot)
+
+    @staticmethod
+    def apply(view, snapshot):
+        """Restore the view's selection, scroll position, syntax, and sticky state."""
+
+        if snapshot["syntax"] and view.settings().get("syntax") != snapshot["syntax"]:
+            view.assign_syntax(snapshot["syntax"])
+        if snapshot["selection"]:
+            size = view.size()
+            sel = view.sel()
+            sel.clear()
+            for a, b in snapshot["selection"]:
+                sel.add(sublime.Region(min(a, size), min(b, size)))
+        view.set_viewport_position(tuple(snapshot["viewport"]), False)
+        if snapshot["sticky"]:
+            view.settings().set("tabs_extra_sticky", True)
+
+
+class Hibernation(object):
+    """Snapshots of each window's hibernated tabs, most recently hibernated last."""
+
+    windows = {}
+
+    @classmethod
+    def add(cls, window, snapshots):
+        """Remember the snapshots of the window's hibernated tabs."""
+
+        cls.windows.setdefault(window.id(), []).extend(snapshots)
+
+    @classmethod
+    def get(cls, window):
+        """Get the window's snapshots."""
+
+        return cls.windows.get(window.id(), [])
+
+    @classmethod
+    def take(cls, window, indexes=None):
+        """Remove and return the window's snapshots at the given indexes, or all of them."""
+
+        snapshots = cls.windows.pop(window.id(), [])
+        if indexes is None:
+            return snapshots
+        taken = [snapshots[i] for i in indexes]
+        remaining = [s for i, s in enumerate(snapshots) if i not in indexes]
+        if remaining:
+            cls.windows[window.id()] = remaining
+        return taken
+
+    @classmethod
+    def clear(cls):
+        """Forget all hibernated tabs."""
+
+        cls.windows = {}
+        TabSnapshot.pending = {}
+
+
+class TabsExtraHibernateCommand(TabsExtraCloseCommand):
+    """Close clean tabs and remember them so they can be restored later."""
+
+    def run(self, scope="group", group=-1, inactive_minutes=None):
+        """
+        Hibernate tabs.
+
+        `scope` can be `group` (the given or active group) or `window`.  Only
+        saved tabs without unsaved changes that are not sticky are hibernated,
+        and the active tab of each group is kept.  With `inactive_minutes`, only
+        tabs that have not been activated for that many minutes are hibernated.
+        """
+
+        if scope == "window":
+            groups = range(self.window.num_groups())
+        else:
+            groups = [self.window.active_group() if group == -1 else int(group)]
+        cutoff = time.time() - float(inactive_minutes) * 60 if inactive_minutes is not None else None
+
+        targets = []
+        snapshots = []
+        for g in groups:
+            active = self.window.active_view_in_group(g)
+            for view in self.window.views_in_group(g):
+                if (
+                    (active is not None and view.id() == active.id()) or
+                    view.file_name() is None or
+                    view.is_dirty() or
+                    view.settings().get("tabs_extra_sticky", False) or
+                    (cutoff is not None and view.settings().get("tabs_extra_last_activated", 0) >= cutoff)
+                ):
+                    continue
+                targets.append(view.sheet())
+                snapshots.append(TabSnapshot.capture(self.window, view))
+        if not targets:
+            return
+
+        self.persistent = True
+        TabsExtraListener.extra_command_call = True
+        start = time.perf_counter()
+        active_sheet = self.window.active_sheet()
+        closed = 0
+        try:
+            closed = self.close_sheets(self.window, targets, False, True, False, True)
+        except Exception:
+            pass
+        open_files = set(v.file_name() for v in self.window.views())
+        Hibernation.add(self.window, [s for s in snapshots if s["file"] not in open_files])
+        self.finish(True, closed, start, [active_sheet])
+        sublime.status_message("Hibernated %d tabs" % closed)
+
+
+class TabsExtraRestoreHibernatedCommand(sublime_plugin.WindowCommand):
+    """Restore hibernated tabs."""
+
+    def run(self, restore_all=False):
+        """Restore all hibernated tabs, or pick the tabs to restore from a quick panel."""
+
+        if restore_all:
+            self.restore(None)
+            return
+
+        snapshots = Hibernation.get(self.window)
+        items = [["Restore All", "%d hibernated tabs" % len(snapshots)]]
+        for snapshot in snapshots:
+            items.append([os.path.basename(snapshot["file"]), snapshot["file"]])
+        self.window.show_quick_panel(items, self.check_selection)
+
+    def check_selection(self, value):
+        """Restore the selected tab, or all tabs."""
+
+        if value == 0:
+            self.restore(None)
+        elif value > 0:
+            self.restore([value - 1])
+
+    def restore(self, indexes):
+        """Reopen the hibernated tabs."""
+
+        TabSnapshot.restore(self.window, Hibernation.take(self.window, indexes))
+
+    def is_enabled(self, restore_all=False):
+        """Check if there are hibernated tabs."""
+
+        return bool(Hibernation.get(self.window))
+
+
+class CloseJournal(object):
+    """
+    A bounded journal of close operations, most recent last.
+
+    Each close operation is one entry holding the snapshots of all the files it
+    closed, so the whole operation can be reopened at once.  The journal keeps
+    at most `close_journal_size` entries across all windows.
+    """
+
+    entries = []
+
+    @staticmethod
+    def size():
+        """Get the maximum number of entries, or zero if disabled."""
+
+        return max(0, int(sublime.load_settings(SETTINGS).get("close_journal_size", 20)))
+
+    @classmethod
+    def record(cls, window, snapshots):
+        """Record the snapshots of one close operation in the window."""
+
+        size = cls.size()
+        if snapshots and size:
+            cls.entries.append({"window": window.id(), "time": time.time(), "snapshots": snapshots})
+        if len(cls.entries) > size:
+            del cls.entries[:len(cls.entries) - size]
+
+    @classmethod
+    def get(cls, window):
+        """Get the window's entries, most recent first."""
+
+        return [e for e in reversed(cls.entries) if e["window"] == window.id()]
+
+    @classmethod
+    def take(cls, entry):
+        """Remove an entry and return its snapshots."""
+
+        cls.entries = [e for e in cls.entries if e is not entry]
+        return entry["snapshots"]
+
+    @classmethod
+    def clear(cls):
+        """Forget all entries."""
+
+        cls.entries = []
+
+
+class TabsExtraReopenClosedCommand(sublime_plugin.WindowCommand):
+    """Reopen the tabs closed by one close operation."""
+
+    def run(self, show_panel=False):
+        """Reopen the window's most recently closed tabs, or pick a close operation from a quick panel."""
+
+        self.entries = CloseJournal.get(self.window)
+        if not self.entries:
+            return
+        if not show_panel:
+            self.reopen(0)
+            return
+
+        items = []
+        for entry in self.entries:
+            names = [os.path.basename(s["file"]) for s in entry["snapshots"]]
+            items.append(
+                [
+                    "%d tabs closed at %s" % (len(names), time.strftime("%H:%M:%S", time.localtime(entry["time"]))),
+                    ", ".join(names[:5]) + (", ..." if len(names) > 5 else "")
+                ]
+            )
+        self.window.show_quick_panel(items, self.reopen)
+
+    def reopen(self, value):
+        """Reopen every tab of the selected entry at its original position."""
+
+        if value >= 0:
+            TabSnapshot.restore(self.window, CloseJournal.take(self.entries[value]))
+
+    def is_enabled(self, show_panel=False):
+        """Check if the window has closed tabs to reopen."""
+
+        return bool(CloseJournal.get(self.window))
+
+
+###############################
+# Sort Generation
+###############################
+class SortGeneration(object):
+    """
+    Per group counters of events that can invalidate a sort.
+
+    Membership events (load, close, move) invalidate every sort.  Other events
+    only invalidate sorts whose modules list them in `SORT_EVENTS`; modules that
+    don't define `SORT_EVENTS` are invalidated by every event.  Events raised by a
+    view are also counted per view under `(event, view_id)`, so a sort that
+    recomputes the key of that view anyway can leave them out.
+
+    A save only counts as a rename if the file name differs from the one last
+    seen for the view.  Views whose name was never seen, such as views opened
+    before the plugin loaded, count as renamed on their first save.
+    """
+
+    MEMBERSHIP = ('load', 'close', 'move')
+    EVENTS = MEMBERSHIP + ('save', 'rename', 'modify', 'activate')
+
+    counters = {}
+    active = {}
+    names = {}
+
+    @classmethod
+    def bump(cls, key, event):
+        """Bump the event counter of the `(window_id, group)` key."""
+
+        counts = cls.counters.setdefault(key, {})
+        counts[event] = counts.get(event, 0) + 1
+
+    @classmethod
+    def bump_view(cls, view, event):
+        """Bump the event counter for the view's group and the view's own counter."""
+
+        window = view.window()
+        if window is not None:
+            group = window.get_view_index(view)[0]
+            if group != -1:
+                key = (window.id(), group)
+                cls.bump(key, event)
+                if event == 'close':
+                    counts = cls.counters[key]
+                    for e in cls.EVENTS:
+                        counts.pop((e, view.id()), None)
+                    cls.names.pop(view.id(), None)
+                else:
+                    cls.bump(key, (event, view.id()))
+
+    @classmethod
+    def seen(cls, view):
+        """Remember the view's file name."""
+
+        cls.names[view.id()] = view.file_name()
+
+    @classmethod
+    def saved(cls, view):
+        """Bump the save counter for the view's group, and the rename counter if its file name changed."""
+
+        cls.bump_view(view, 'save')
+        cls.renamed(view)
+
+    @classmethod
+    def renamed(cls, view):
+        """Bump the rename counter for the view's group if its file name changed."""
+
+        name = view.file_name()
+        if view.id() not in cls.names or cls.names[view.id()] != name:
+            cls.names[view.id()] = name
+            cls.bump_view(view, 'rename')
+
+    @classmethod
+    def activated(cls, view):
+        """Bump the activation counter if the group's active view changed."""
+
+        window = view.window()
+        if window is not None:
+            group = window.get_view_index(view)[0]
+            if group != -1:
+                key = (window.id(), group)
+                if cls.active.get(key) != view.id():
+                    cls.active[key] = view.id()
+                    cls.bump(key, 'activate')
+
+    @classmethod
+    def snapshot(cls, key):
+        """Get a copy of the counters of the `(window_id, group)` key."""
+
+        return dict(cls.counters.get(key, {}))
+
+    @classmethod
+    def unchanged(cls, key, previous, events=None, view_id=None):
+        """
+        Check if none of the relevant events occurred since `previous` was taken.
+
+        Events raised by the view with `view_id` are ignored.
+        """
+
+        current = cls.counters.get(key, {})
+        relevant = cls.EVENTS if events is None else cls.MEMBERSHIP + tuple(events)
+        return all(
+            current.get(e, 0) - current.get((e, view_id), 0) == previous.get(e, 0) - previous.get((e, view_id), 0)
+            for e in relevant
+        )
+
+    @classmethod
+    def clear(cls):
+        """Clear all counters."""
+
+        cls.counters = {}
+        cls.active = {}
+        cls.names = {}
+
+
+###############################
+# Sort Scheduler
+###############################
+class SortScheduler(object):
+    """
+    Coalesce sort on load/save requests.
+
+    Affected groups are collected until no new request has arrived for
+    `sort_on_load_save_delay` milliseconds, then each group is sorted once.
+    """
+
+    pending = {}
+    generation = 0
+
+    @classmethod
+    def schedule(cls, window, group, view):
+        """Schedule a sort of the view's group."""
+
+        key = (window.id(), group)
+        if key not in cls.pending:
+            cls.pending[key] = (window, set())
+        cls.pending[key][1].add(view.id())
+        cls.generation += 1
+        delay = int(sublime.load_settings(SETTINGS).get("sort_on_load_save_delay", 100))
+        if delay > 0:
+            sublime.set_timeout(functools.partial(cls.flush, cls.generation), delay)
+        else:
+            cls.flush(cls.generation)
+
+    @classmethod
+    def cancel(cls):
+        """Cancel all pending sorts."""
+
+        cls.pending = {}
+        cls.generation += 1
+
+    @classmethod
+    def flush(cls, generation):
+        """Sort all affected groups once things have been quiet."""
+
+        if generation != cls.generation:
+            return
+
+        pending = cls.pending
+        cls.pending = {}
+        settings = sublime.load_settings(SETTINGS)
+        cmd = settings.get("sort_on_load_save_command", {})
+        module = get_sort_by(cmd.get("module", ""))
+        reverse = bool(cmd.get("reverse", False))
+        incremental = settings.get("sort_on_load_save_incremental", True)
+        if module == "":
+            return
+
+        for (win_id, group), (window, view_ids) in pending.items():
+            if not window.is_valid() or group >= window.num_groups():
+                continue
+            args = {"group": group, "sort_by": module, "reverse": reverse, "skip_unchanged": True}
+            if incremental and len(view_ids) == 1:
+                args["view_id"] = next(iter(view_ids))
+            debug("sorting group %d for %d loaded/saved views" % (group, len(view_ids)))
+            window.run_command("tabs_extra_sort", args)
+
+
+class LiveMRU(object):
+    """
+    Keep groups in most recently used order as tabs are activated.
+
+    When `live_mru_order` is enabled, the activated tab is moved to the front
+    of its group, after any sticky tabs at the front, once no other tab has been
+    activated for `live_mru_delay` milliseconds.  Cycling through tabs quickly
+    therefore only moves the tab that is finally settled on.  Sticky tabs are
+    never moved.
+    """
+
+    view = None
+    generation = 0
+
+    @staticmethod
+    def enabled():
+        """Check if live MRU ordering is enabled."""
+
+        return bool(sublime.load_settings(SETTINGS).get("live_mru_order", False))
+
+    @classmethod
+    def schedule(cls, view):
+        """Schedule the view to be moved to the front of its group."""
+
+        if not cls.enabled():
+            return
+        cls.view = view
+        cls.generation += 1
+        delay = int(sublime.load_settings(SETTINGS).get("live_mru_delay", 500))
+        if delay > 0:
+            sublime.set_timeout(functools.partial(cls.move, cls.generation), delay)
+        else:
+            cls.move(cls.generation)
+
+    @classmethod
+    def cancel(cls):
+        """Cancel the pending move."""
 
-        group = -1
-        index = -1
-        sheet = self.window.active_sheet()
-        if sheet is not None:
-            group, index = self.window.get_sheet_index(sheet)
-        return group != -1 and index != -1 and mode in ["normal", "skip_unsaved", "dismiss_unsaved"]
+        cls.view = None
+        cls.generation += 1
 
+    @classmethod
+    def move(cls, generation):
+        """Move the last activated view to the front of its group if it is still active."""
 
-class TabsExtraCloseAllCommand(sublime_plugin.WindowCommand):
-    """Close all tabs in the whole window."""
+        if generation != cls.generation:
+            return
+        view = cls.view
+        cls.view = None
+        if view is None or view.settings().get("tabs_extra_sticky", False):
+            return
+        window = view.window()
+        if window is None or window.active_view() != view:
+            return
+        group, index = window.get_view_index(view)
+        if group < 0 or index < 0:
+            return
 
-    def run(self):
-        """Close all tabs in window; not just the tabs in the active group."""
+        target = 0
+        for v in window.views_in_group(group):
+            if v == view or not v.settings().get("tabs_extra_sticky", False):
+                break
+            target += 1
+        if index != target:
+            window.set_view_index(view, group, target)
+            SortGeneration.bump((window.id(), group), 'move')
 
-        for group in range(0, self.window.num_groups()):
-            sheet = self.window.active_sheet_in_group(group)
-            if sheet is not None:
-                index = self.window.get_sheet_index(sheet)[1]
-                self.window.run_command("tabs_extra_close", {"close_type": "all", "group": group, "index": index})
 
+class SortWatcher(object):
+    """
+    Re-sort tabs when their files change on disk.
 
-class TabsExtraCloseCommand(sublime_plugin.WindowCommand):
-    """Close tab command."""
+    When `watch_sort` is enabled, the files of all open tabs are watched (see
+    `tab_watch.FileWatcher`) every `watch_sort_interval` milliseconds.
+    Changes are collected until a check finds nothing new, then each affected
+    group is sorted once with `watch_sort_command`.  Sorting only moves the tabs
+    that are out of place, and a lone changed tab is placed using the keys of the
+    last sort when possible.
+    """
 
-    def init(self, close_type, group, index):
-        """
-        Determine which views will be targeted by close command.
+    watcher = None
+    stale = True
+    changed = set()
+    generation = 0
 
-        Also determine which tab states need to be cleaned up.
-        """
+    @staticmethod
+    def enabled():
+        """Check if watching is enabled."""
 
-        self.persistent = is_persistent()
-        self.sheets = self.window.sheets_in_group(int(group))
-        if close_type not in ["single", "left", "right", "other", "all"]:
-            raise ValueError("Unrecognized close type of '{}'".format(close_type))
+        return bool(sublime.load_settings(SETTINGS).get("watch_sort", False))
 
-        # Setup active index and group
-        active_sheet = self.window.active_sheet()
-        active_index = None
-        self.active_index = index
-        self.active_group = None
-        if active_sheet is not None:
-            active_group, active_index = self.window.get_sheet_index(active_sheet)
-            if group != active_group:
-                active_index = None
-        if active_index is not None:
-            self.active_index = active_index
+    @classmethod
+    def refresh(cls):
+        """Start or stop watching to match the settings."""
 
-        # Determine targeted sheets to close and sheets to cleanup
-        if close_type == "single":
-            self.targets = [self.sheets[index]]
-            self.cleanup = bool(len(self.sheets[:index] + self.sheets[index + 1:]))
-        elif close_type == "left":
-            self.targets = self.sheets[:index]
-            self.cleanup = bool(len(self.sheets[index:]))
-        elif close_type == "right":
-            self.targets = self.sheets[index + 1:]
-            self.cleanup = bool(len(self.sheets[:index + 1]))
-        elif close_type == "other":
-            self.targets = self.sheets[:index] + self.sheets[index + 1:]
-            self.cleanup = True
-        elif close_type == "all":
-            self.targets = self.sheets[:]
-            self.cleanup = False
+        if cls.enabled():
+            if cls.watcher is None:
+                cls.start()
+        elif cls.watcher is not None:
+            cls.stop()
 
-    def can_close(self, is_sticky, is_single):
-        """Prompt user in certain scenarios if okay to close."""
+    @classmethod
+    def start(cls):
+        """Start watching."""
 
-        is_okay = True
-        if is_sticky:
-            if not is_single:
-                is_okay = False
-        return is_okay
+        settings = sublime.load_settings(SETTINGS)
+        cls.watcher = tab_watch.FileWatcher(
+            int(settings.get("watch_sort_max_watches", 256)),
+            int(settings.get("watch_sort_poll_batch", 1000))
+        )
+        cls.stale = True
+        cls.changed = set()
+        cls.generation += 1
+        sublime.set_timeout_async(functools.partial(cls.tick, cls.generation), 0)
 
-    def run(
-        self, group=-1, index=-1,
-        close_type="single", unsaved_prompt=True, close_unsaved=True
-    ):
-        """Close the specified tabs and cleanup sticky states."""
+    @classmethod
+    def stop(cls):
+        """Stop watching."""
 
-        TabsExtraListener.extra_command_call = True
+        cls.generation += 1
+        if cls.watcher is not None:
+            cls.watcher.close()
+            cls.watcher = None
+        cls.changed = set()
 
-        try:
-            if group >= 0 and index >= 0:
-                self.init(close_type, group, index)
+    @classmethod
+    def invalidate(cls):
+        """Flag the set of open files as changed."""
 
-                if (
-                    len(self.targets) and
-                    not unsaved_prompt and
-                    not all(not target.view().is_dirty() for target in self.targets) and
-                    not sublime.ok_cancel_dialog(
-                        "Are you sure you want to dismiss all targeted unsaved buffers?"
-                    )
-                ):
-                    TabsExtraListener.extra_command_call = False
-                    return
+        cls.stale = True
 
-                for s in self.targets:
-                    v = s.view()
-                    if v is not None:
-                        if self.can_close(v.settings().get("tabs_extra_sticky", False), close_type == "single"):
-                            if not self.persistent:
-                                v.settings().erase("tabs_extra_sticky")
-                            self.window.focus_view(v)
-                            if not v.is_dirty() or close_unsaved:
-                                if not unsaved_prompt:
-                                    v.set_scratch(True)
-                                if ST_4114:
-                                    sublime_api.window_close_file(self.window.id(), v.id(), close_callback_noop)
-                                else:
-                                    sublime_api.window_close_file(self.window.id(), v.id())
-                        elif not self.persistent:
-                            v.settings().erase("tabs_extra_sticky")
-                    else:
-                        if ST_4088:
-                            if ST_4114:
-                                sublime_api.sheet_close(s.id(), close_callback_noop)
-                            else:
-                                sublime_api.sheet_close(s.id())
-                        else:
-                            self.window.focus_sheet(s)
-                            self.window.run_command('close_file')
+    @classmethod
+    def tick(cls, generation):
+        """Check for changes and flush them once things are quiet."""
 
-                if not self.persistent and self.cleanup:
-                    self.window.run_command("tabs_extra_clear_all_sticky", {"group": group})
-        except Exception:
-            pass
+        if generation != cls.generation or cls.watcher is None:
+            return
 
-        TabsExtraListener.extra_command_call = False
+        if cls.stale:
+            cls.stale = False
+            cls.watcher.watch([v.file_name() for w in sublime.windows() for v in w.views()])
+            debug("watching files - %s" % str(cls.watcher.stats()))
+
+        changed = cls.watcher.poll()
+        if changed:
+            cls.changed |= changed
+        elif cls.changed:
+            paths = cls.changed
+            cls.changed = set()
+            sublime.set_timeout(functools.partial(cls.flush, paths), 0)
+
+        interval = max(50, int(sublime.load_settings(SETTINGS).get("watch_sort_interval", 500)))
+        sublime.set_timeout_async(functools.partial(cls.tick, generation), interval)
+
+    @classmethod
+    def flush(cls, paths):
+        """Sort the groups of the changed files."""
+
+        settings = sublime.load_settings(SETTINGS)
+        cmd = settings.get("watch_sort_command", {})
+        module = get_sort_by(cmd.get("module", ""))
+        reverse = bool(cmd.get("reverse", False))
+        if module == "":
+            return
+
+        for window in sublime.windows():
+            affected = {}
+            for group in range(window.num_groups()):
+                for view in window.views_in_group(group):
+                    file_name = view.file_name()
+                    if file_name in paths:
+                        tab_sort_helper.StatCache.invalidate(file_name)
+                        SortGeneration.bump_view(view, 'save')
+                        SortKeyWarmer.invalidate(view)
+                        affected.setdefault(group, []).append(view)
+            for group, views in affected.items():
+                args = {"group": group, "sort_by": module, "reverse": reverse, "skip_unchanged": True}
+                if len(views) == 1:
+                    args["view_id"] = views[0].id()
+                debug("sorting group %d for %d changed files" % (group, len(views)))
+                window.run_command("tabs_extra_sort", args)
 
 
 ###############################
@@ -482,6 +1561,7 @@ class TabsExtraListener(sublime_plugin.EventListener):
     """Listener command to handle tab focus, closing, moving events."""
 
     extra_command_call = False
+    batch_close = False
 
     def on_window_command(self, window, command_name, args):
         """Intercept and override specific close tab commands."""
@@ -518,10 +1598,24 @@ class TabsExtraListener(sublime_plugin.EventListener):
             cmd = (command_name, args)
         return cmd
 
+    def on_new(self, view):
+        """Remember the file name of new views."""
+
+        SortGeneration.seen(view)
+
     def on_load(self, view):
         """Mange sorting."""
 
         Focus.cancel()
+        tab_sort_helper.StatCache.invalidate(view.file_name())
+        SortGeneration.bump_view(view, 'load')
+        SortGeneration.seen(view)
+        SortKeyWarmer.invalidate(view)
+        SortKeyWarmer.schedule()
+        SortWatcher.invalidate()
+        TabRecency.touch(view)
+        TabBudget.schedule(view.window())
+        TabSnapshot.loaded(view)
 
         if sort_on_load_save():
             if not self.on_sort(view):
@@ -530,23 +1624,51 @@ class TabsExtraListener(sublime_plugin.EventListener):
     def on_post_save(self, view):
         """On save sorting."""
 
+        tab_sort_helper.StatCache.invalidate(view.file_name())
+        tab_git.GitStatusCache.invalidate()
+        SortGeneration.saved(view)
+        SortKeyWarmer.invalidate(view)
+        SortKeyWarmer.schedule()
+        SortWatcher.invalidate()
+
         if sort_on_load_save():
             self.on_sort(view)
 
+    def on_reload(self, view):
+        """Track files reloaded from disk."""
+
+        tab_sort_helper.StatCache.invalidate(view.file_name())
+        tab_git.GitStatusCache.invalidate()
+        SortGeneration.bump_view(view, 'save')
+        SortKeyWarmer.invalidate(view)
+
+    def on_revert(self, view):
+        """Track files reverted from disk."""
+
+        tab_sort_helper.StatCache.invalidate(view.file_name())
+        SortGeneration.bump_view(view, 'save')
+        SortKeyWarmer.invalidate(view)
+
+    def on_modified(self, view):
+        """
+        Track buffer modifications.
+
+        This runs on the main thread, like the sorts that read the counters and
+        the keys.
+        """
+
+        SortGeneration.bump_view(view, 'modify')
+        SortKeyWarmer.invalidate(view)
+        SortKeyWarmer.schedule()
+
     def on_sort(self, view):
         """Sort views."""
 
         sorted_views = False
         window = view.window()
-        if window and window.get_view_index(view)[1] != -1:
-            cmd = sublime.load_settings(SETTINGS).get("sort_on_load_save_command", {})
-            module = str(cmd.get("module", ""))
-            reverse = bool(cmd.get("reverse", False))
-            if module != "":
-                window.run_command(
-                    "tabs_extra_sort",
-                    {"sort_by": module, "reverse": reverse}
-                )
+        group, index = window.get_view_index(view) if window else (-1, -1)
+        if index != -1:
+            SortScheduler.schedule(window, group, view)
             sorted_views = True
         return sorted_views
 
@@ -558,8 +1680,16 @@ class TabsExtraListener(sublime_plugin.EventListener):
         """
 
         Focus.cancel()
+        SortGeneration.bump_view(view, 'close')
+        SortKeyWarmer.invalidate(view)
+        SortWatcher.invalidate()
+        TabRecency.remove(view)
+        TabSnapshot.pending.pop(view.id(), None)
 
         view.settings().set("tabs_extra_is_closed", True)
+        if TabsExtraListener.batch_close:
+            # Focus is restored once the batch is done.
+            return
         if not view.settings().get("tabs_extra_closing", False):
             TabsExtraListener.extra_command_call = True
             window = view.window()
@@ -588,12 +1718,20 @@ class TabsExtraListener(sublime_plugin.EventListener):
         Detect if on_move event should be executed.
         """
 
+        if TabsExtraListener.batch_close:
+            # Tabs are being closed in a batch; focus is restored once it is done.
+            return
         if not TabsExtraListener.extra_command_call:
             window = view.window()
             if window is None:
                 return
             s = window.active_sheet()
             timestamp_view(window, s)
+        SortGeneration.activated(view)
+        SortKeyWarmer.schedule()
+        TabRecency.touch(view)
+        if not TabsExtraListener.extra_command_call:
+            LiveMRU.schedule(view)
 
         # Detect if tab was moved to a new group
         # Run on_move event if it has.
@@ -606,6 +1744,8 @@ class TabsExtraListener(sublime_plugin.EventListener):
             active_group = window.get_view_index(view)[0]
             if window.id() != win_id or int(group_id) != int(active_group):
                 view.settings().erase("tabs_extra_moving")
+                SortGeneration.bump((win_id, int(group_id)), 'move')
+                SortGeneration.bump((window.id(), active_group), 'move')
         elif sort_on_load_save() and view.settings().get('tabsextra_to_sort'):
             view.settings().erase('tabsextra_to_sort')
             self.on_sort(view)
@@ -750,6 +1890,9 @@ class TabsExtraRenameCommand(sublime_plugin.WindowCommand):
             v = self.window.find_open_file(old)
             if v:
                 v.retarget(new)
+                tab_sort_helper.StatCache.invalidate(old)
+                SortGeneration.renamed(v)
+                SortKeyWarmer.invalidate(v)
         except Exception:
             sublime.status_message("Unable to rename")
 
@@ -806,6 +1949,9 @@ class TabsExtraMoveCommand(sublime_plugin.WindowCommand):
             v = self.window.find_open_file(old)
             if v:
                 v.retarget(new)
+                tab_sort_helper.StatCache.invalidate(old)
+                SortGeneration.renamed(v)
+                SortKeyWarmer.invalidate(v)
         except Exception:
             sublime.status_message("Unable to move")
 
@@ -889,19 +2035,254 @@ class TabsExtraFilePathCommand(sublime_plugin.WindowCommand):
 ###############################
 # Sort
 ###############################
+class SortModuleCache(object):
+    """Cache of compiled sort modules keyed by module name and resource hash."""
+
+    modules = {}
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def clear(cls):
+        """Clear the cache and reset the counters."""
+
+        for module_name in cls.modules:
+            sys.modules.pop(module_name, None)
+        cls.modules = {}
+        cls.hits = 0
+        cls.misses = 0
+
+    @classmethod
+    def stats(cls):
+        """Return cache hit and miss counts."""
+
+        return {"hits": cls.hits, "misses": cls.misses, "size": len(cls.modules)}
+
+    @classmethod
+    def get(cls, module_name):
+        """
+        Get the sort module.
+
+        The resource is always read so that changes are detected, but it is
+        only compiled when the content differs from the cached version.
+        """
+
+        path_name = os.path.join("Packages", os.path.normpath(module_name.replace('.', '/')))
+        path_name += ".py"
+        source = sublime.load_resource(sublime_format_path(path_name))
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+        entry = cls.modules.get(module_name)
+        if entry is not None and entry[0] == digest:
+            cls.hits += 1
+            debug("sort module cache hit - %s (%s)" % (module_name, str(cls.stats())))
+            return entry[1]
+
+        module = types.ModuleType(module_name)
+        exec(compile(source, module_name, 'exec'), module.__dict__)
+        sys.modules[module_name] = module
+        cls.modules[module_name] = (digest, module)
+        cls.misses += 1
+        debug("sort module cache miss - %s (%s)" % (module_name, str(cls.stats())))
+        return module
+
+
+def load_sort_module(module_name):
+    """Import the sort_by module or create a composite of several modules."""
+
+    if isinstance(module_name, (list, tuple)):
+        return tab_sort_helper.CompositeSortModule([SortModuleCache.get(name) for name in module_name])
+    return SortModuleCache.get(module_name)
+
+
+class SortKeyWarmer(object):
+    """
+    Precompute sort keys while the editor is idle.
+
+    When `sort_key_warming` is enabled, keys for the modules in `sort_layout` are
+    computed for the active window's tabs once there has been no activity for
+    `sort_key_warming_delay` milliseconds.  Keys are cached per view and dropped
+    when the view is edited, saved, reloaded, or closed.  Only modules whose keys
+    don't depend on other tabs (`INCREMENTAL`) and only change on tracked events
+    (`SKIP_UNCHANGED`) are cached.
+
+    Keys are computed off the UI thread, so each invalidation is stamped and keys
+    computed before the last invalidation of their view are not stored.
+    """
+
+    lock = threading.Lock()
+    keys = {}
+    generation = 0
+    hits = 0
+    misses = 0
+    stamp = 0
+    cleared = 0
+    invalidated = {}
+
+    @staticmethod
+    def enabled():
+        """Check if key warming is enabled."""
+
+        return bool(sublime.load_settings(SETTINGS).get("sort_key_warming", False))
+
+    @staticmethod
+    def cacheable(sort_module):
+        """Check if the module's keys can be cached per view."""
+
+        return getattr(sort_module, 'INCREMENTAL', True) and getattr(sort_module, 'SKIP_UNCHANGED', True)
+
+    @staticmethod
+    def cache_key(sort_by, context):
+        """Get the cache key for the given sort and context."""
+
+        return (tuple(sort_by) if isinstance(sort_by, list) else sort_by, context.settings["numeric_sort"])
+
+    @classmethod
+    def invalidate(cls, view):
+        """Drop the cached keys of a view."""
+
+        view_id = view.id()
+        with cls.lock:
+            cls.stamp += 1
+            cls.invalidated[view_id] = cls.stamp
+            for keys in cls.keys.values():
+                keys.pop(view_id, None)
+
+    @classmethod
+    def clear(cls):
+        """Clear the cache."""
+
+        with cls.lock:
+            cls.keys = {}
+            cls.generation += 1
+            cls.hits = 0
+            cls.misses = 0
+            cls.stamp += 1
+            cls.cleared = cls.stamp
+            cls.invalidated = {}
+
+    @classmethod
+    def stats(cls):
+        """Return the hit and miss counts."""
+
+        with cls.lock:
+            return {"hits": cls.hits, "misses": cls.misses, "modules": len(cls.keys)}
+
+    @classmethod
+    def gather(cls, sort_by, sort_module, views, view_data, context):
+        """
+        Gather view data, only running the module for views without cached keys.
+
+        Falls back to running the module on all views if warming is disabled or
+        the module's keys can't be cached.
+        """
+
+        if not context.get("sort_key_warming", False) or not cls.cacheable(sort_module):
+            tab_sort_helper.run_sort_module(sort_module, views, view_data, context)
+            return
+
+        cache_key = cls.cache_key(sort_by, context)
+        with cls.lock:
+            cached = dict(cls.keys.get(cache_key, {}))
+            stamp = cls.stamp
+        missing = [v for v in views if v.id() not in cached]
+        if missing:
+            data = []
+            tab_sort_helper.run_sort_module(sort_module, missing, data, context)
+            for entry in data:
+                cached[entry[-1].id()] = entry[:-1]
+            cls.store(cache_key, data, stamp)
+        with cls.lock:
+            cls.hits += len(views) - len(missing)
+            cls.misses += len(missing)
+        for v in views:
+            view_data.append(cached[v.id()] + (v,))
+
+    @classmethod
+    def store(cls, cache_key, data, stamp):
+        """Store view data computed after `stamp`, skipping views invalidated since."""
+
+        with cls.lock:
+            if stamp < cls.cleared:
+                return
+            keys = cls.keys.setdefault(cache_key, {})
+            for entry in data:
+                view = entry[-1]
+                if view.is_valid() and cls.invalidated.get(view.id(), 0) <= stamp:
+                    keys[view.id()] = entry[:-1]
+
+    @classmethod
+    def schedule(cls):
+        """Restart the idle timer."""
+
+        cls.generation += 1
+        if cls.enabled():
+            delay = int(sublime.load_settings(SETTINGS).get("sort_key_warming_delay", 1000))
+            sublime.set_timeout(functools.partial(cls.warm, cls.generation), delay)
+
+    @classmethod
+    def warm(cls, generation):
+        """Start warming keys if the editor has stayed idle."""
+
+        if generation != cls.generation:
+            return
+        window = sublime.active_window()
+        if window is None:
+            return
+        views = [v for g in range(window.num_groups()) for v in window.views_in_group(g)]
+        if not views:
+            return
+        modules = []
+        for entry in sublime.load_settings(SETTINGS).get("sort_layout", []):
+            sort_by = get_sort_by(entry.get("module", ""))
+            if sort_by == "":
+                continue
+            try:
+                modules.append((sort_by, load_sort_module(sort_by)))
+            except Exception as e:
+                debug("could not load sort module %s - %s" % (str(sort_by), str(e)))
+        sublime.set_timeout_async(functools.partial(cls.compute, generation, window, views, modules), 0)
+
+    @classmethod
+    def compute(cls, generation, window, views, modules):
+        """Compute the missing keys, stopping as soon as there is new activity."""
+
+        context = tab_sort_helper.SortContext(window)
+        for sort_by, sort_module in modules:
+            if generation != cls.generation:
+                return
+            if not cls.cacheable(sort_module):
+                continue
+            cache_key = cls.cache_key(sort_by, context)
+            with cls.lock:
+                cached = cls.keys.get(cache_key, {})
+                missing = [v for v in views if v.id() not in cached]
+                stamp = cls.stamp
+            if missing:
+                data = []
+                try:
+                    tab_sort_helper.run_sort_module(sort_module, missing, data, context)
+                except Exception as e:
+                    debug("could not warm sort keys for %s - %s" % (str(sort_by), str(e)))
+                    continue
+                cls.store(cache_key, data, stamp)
+        debug("warmed sort keys - %s" % str(cls.stats()))
+
+
 class TabsExtraSortMenuCommand(sublime_plugin.WindowCommand):
     """Sort tabs."""
 
-    def run(self):
+    def run(self, scope="group"):
         """Using "sort_layout" setting, construct a quick panel sort menu."""
 
+        self.scope = scope
         sort_layout = sublime.load_settings(SETTINGS).get("sort_layout", [])
         if len(sort_layout):
             self.sort_commands = []
             sort_menu = []
             for sort_entry in sort_layout:
                 caption = str(sort_entry.get("caption", ""))
-                module = str(sort_entry.get("module", ""))
+                module = get_sort_by(sort_entry.get("module", ""))
                 reverse = bool(sort_entry.get("reverse", False))
                 if module != "":
                     self.sort_commands.append((module, reverse))
@@ -914,56 +2295,405 @@ class TabsExtraSortMenuCommand(sublime_plugin.WindowCommand):
 
         if value != -1:
             command = self.sort_commands[value]
-            self.window.run_command("tabs_extra_sort", {"sort_by": command[0], "reverse": command[1]})
+            self.window.run_command(
+                "tabs_extra_sort",
+                {"sort_by": command[0], "reverse": command[1], "scope": self.scope}
+            )
+
+
+class SortGroup(object):
+    """A group targeted by a sort."""
+
+    def __init__(self, window, group, views):
+        """Snapshot the group."""
+
+        self.window = window
+        self.group = group
+        self.views = views
+        self.key = (window.id(), group)
+        self.generation = SortGeneration.snapshot(self.key)
+        self.context = None
+        self.moves = []
+        self.sorted_keys = None
+
+
+class SortTask(object):
+    """
+    Sort one or more groups in two phases.
+
+    Sort keys are computed off the UI thread (blocking I/O is spread over a bounded
+    thread pool by the sort context) and the resulting moves are applied in one batch
+    on the main thread.  The groups of each window share one sort context so view
+    info, file metadata, and project folders are gathered once per window.  Starting
+    a new sort for a group takes the group
+    away from any sort that is still in flight; a sort left with no groups is cancelled.
+    """
+
+    lock = threading.Lock()
+    pending = {}
+    # Sorted keys of the last applied sort of each group:
+    # `(window_id, group) -> (sort_by, reverse, [view_id, ...], [key, ...], generation)` in ascending key order.
+    keys = {}
+
+    @classmethod
+    def unchanged(cls, g, sort_by, sort_module, reverse):
+        """Check if the group is still sorted by the last applied sort and nothing relevant has changed since."""
+
+        cached = cls.keys.get(g.key)
+        if (
+            cached is None or
+            cached[0] != sort_by or
+            cached[1] != reverse or
+            not getattr(sort_module, 'SKIP_UNCHANGED', True)
+        ):
+            return False
+        ids = cached[2][::-1] if reverse else cached[2]
+        return (
+            [v.id() for v in g.views] == ids and
+            SortGeneration.unchanged(g.key, cached[4], getattr(sort_module, 'SORT_EVENTS', None))
+        )
+
+    def __init__(self, groups, sort_by, sort_module, reverse, target=None, window=None):
+        """Snapshot the groups and register the task; `window` is the window that ran the sort."""
+
+        self.start_time = time.perf_counter()
+        self.groups = groups
+        self.sort_by = sort_by
+        self.sort_module = sort_module
+        self.reverse = reverse
+        self.target = target
+        self.window = window
+        self.cancelled = False
+        # Views are captured on demand off the UI thread, so views with warmed
+        # keys or that aren't needed for a single view placement are never queried.
+        self.contexts = OrderedDict()
+        for g in groups:
+            g.context = self.contexts.get(g.window.id())
+            if g.context is None:
+                g.context = tab_sort_helper.SortContext(g.window)
+                self.contexts[g.window.id()] = g.context
+
+        with SortTask.lock:
+            previous = set()
+            for g in groups:
+                task = SortTask.pending.get(g.key)
+                if task is not None:
+                    previous.add(task)
+                    debug("cancelled in flight sort of group %d" % g.group)
+                SortTask.pending[g.key] = self
+            for task in previous:
+                if not any(SortTask.pending.get(x.key) is task for x in task.groups):
+                    task.cancel()
+
+    def cancel(self):
+        """Cancel the sort."""
+
+        self.cancelled = True
+        for context in self.contexts.values():
+            context.cancel()
+
+    def start(self):
+        """Start computing sort keys."""
+
+        sublime.set_timeout_async(self.compute, 0)
+
+    def compute(self):
+        """Compute the sort keys and the needed moves."""
+
+        try:
+            if self.target is None or not self.place(self.groups[0]):
+                view_data = []
+                for context in self.contexts.values():
+                    views = [v for g in self.groups if g.context is context for v in g.views]
+                    SortKeyWarmer.gather(self.sort_by, self.sort_module, views, view_data, context)
+                    context.check()
+                owner = {v.id(): g for g in self.groups for v in g.views}
+                data = {g.key: [] for g in self.groups}
+                for entry in view_data:
+                    data[owner[entry[-1].id()].key].append(entry)
+                for g in self.groups:
+                    sorted_views = tab_sort_helper.sort_view_data(data[g.key])
+                    g.moves = tab_sort_helper.sort_moves(data[g.key], self.reverse, sorted_views)
+                    g.sorted_keys = ([x[-1].id() for x in sorted_views], [x[:-1] for x in sorted_views])
+        except tab_sort_helper.SortCancelled:
+            return
+        except Exception as e:
+            self.release()
+            log("sort failed - %s" % str(e))
+            return
+        sublime.set_timeout(self.apply, 0)
+
+    def place(self, g):
+        """
+        Incrementally place the target view among the other, already sorted views.
+
+        Only the target's key is computed.  `False` is returned if the cached keys
+        can't be trusted and a full sort is required.
+        """
+
+        cached = SortTask.keys.get(g.key)
+        if (
+            cached is None or
+            cached[0] != self.sort_by or
+            cached[1] != self.reverse or
+            not getattr(self.sort_module, 'INCREMENTAL', True)
+        ):
+            return False
+
+        # The target's key is recomputed, but the keys of the other views must not
+        # have changed since the last sort.
+        target_id = self.target.id()
+        cached_ids = [i for i in cached[2] if i != target_id]
+        others = [v.id() for v in g.views if v.id() != target_id]
+        if (
+            others != (cached_ids[::-1] if self.reverse else cached_ids) or
+            not SortGeneration.unchanged(g.key, cached[4], getattr(self.sort_module, 'SORT_EVENTS', None), target_id)
+        ):
+            debug("cached sort keys of group %d are stale" % g.group)
+            return False
+
+        view_data = []
+        tab_sort_helper.run_sort_module(self.sort_module, [self.target], view_data, g.context)
+        g.context.check()
+        if len(view_data) != 1:
+            return False
+        key = view_data[0][:-1]
+        keys = [k for i, k in zip(cached[2], cached[3]) if i != target_id]
+        try:
+            pos = bisect.bisect_right(keys, key)
+        except TypeError:
+            return False
+
+        cached_ids.insert(pos, target_id)
+        keys.insert(pos, key)
+        g.sorted_keys = (cached_ids, keys)
+
+        dest = len(keys) - 1 - pos if self.reverse else pos
+        current = [v.id() for v in g.views].index(target_id)
+        g.moves = [(current, dest)] if current != dest else []
+        return True
+
+    def release(self):
+        """Remove the task from the pending tasks and return the groups it still owns."""
+
+        with SortTask.lock:
+            owned = []
+            for g in self.groups:
+                if SortTask.pending.get(g.key) is self:
+                    del SortTask.pending[g.key]
+                    owned.append(g)
+        return owned
+
+    def apply(self):
+        """Apply the moves on the main thread."""
+
+        if self.cancelled:
+            return
+
+        total_moves = 0
+        total_views = 0
+        for g in self.release():
+            # Skip the group if it changed while keys were being computed.
+            if [v.id() for v in g.window.views_in_group(g.group)] != [v.id() for v in g.views]:
+                debug("group %d changed during sort, skipping" % g.group)
+                continue
+
+            for index, dest in g.moves:
+                g.window.set_view_index(g.views[index], g.group, dest)
+            if g.sorted_keys is not None:
+                SortTask.keys[g.key] = (self.sort_by, self.reverse) + g.sorted_keys + (g.generation,)
+            debug("sorted group %d: %d moves for %d tabs" % (g.group, len(g.moves), len(g.views)))
+            total_moves += len(g.moves)
+            total_views += len(g.views)
+
+        debug(
+            "sorted %d groups: %d moves for %d tabs in %.2f ms" % (
+                len(self.groups), total_moves, total_views, (time.perf_counter() - self.start_time) * 1000
+            )
+        )
+        debug("stat cache - %s" % str(tab_sort_helper.StatCache.stats()))
+        tab_sort_helper.StatCache.prune(self.groups[0].context.settings["stat_cache_ttl"])
+        # Refocus the window that ran the sort last so that it keeps the focus.
+        windows = OrderedDict((g.window.id(), g.window) for g in self.groups)
+        if self.window is not None and windows.pop(self.window.id(), None) is not None:
+            windows[self.window.id()] = self.window
+        for window in windows.values():
+            window.focus_view(window.active_view())
 
 
 class TabsExtraSortCommand(sublime_plugin.WindowCommand):
     """Sort tabs."""
 
-    def run(self, group=-1, sort_by=None, reverse=False):
-        """Sort Tabs."""
+    def run(self, group=-1, sort_by=None, reverse=False, view_id=None, scope="group", skip_unchanged=False):
+        """
+        Sort Tabs.
+
+        `scope` can be `group` (the given or active group), `window` (every group in
+        the window), or `all_windows` (every group in every window).  If `view_id`
+        is provided, only that view is placed if the keys from the last sort of
+        the group are still valid.  With `skip_unchanged`, groups that are still in
+        the order of their last sort, with no relevant events since, are skipped;
+        this is only used by automatic sorts.
+        """
 
         if sort_by is not None:
-            if group == -1:
-                group = self.window.active_group()
-            self.group = group
-            self.reverse = reverse
-            views = self.window.views_in_group(int(group))
-            if len(views):
+            if scope == "all_windows":
+                windows = sublime.windows()
+            else:
+                windows = [self.window]
+
+            if scope in ("window", "all_windows"):
+                targets = [(w, g) for w in windows for g in range(w.num_groups())]
+                view_id = None
+            else:
+                targets = [(self.window, self.window.active_group() if group == -1 else int(group))]
+
+            groups = []
+            for window, g in targets:
+                views = window.views_in_group(g)
+                if len(views):
+                    groups.append(SortGroup(window, g, views))
+
+            if groups:
                 sort_module = self.get_sort_module(sort_by)
                 if sort_module is not None:
-                    view_data = []
-                    sort_module.run(views, view_data)
-                    self.sort(view_data)
-                    self.window.focus_view(self.window.active_view())
+                    for g in (groups[:] if skip_unchanged else []):
+                        if SortTask.unchanged(g, sort_by, sort_module, reverse):
+                            debug("group %d unchanged since last sort, skipping" % g.group)
+                            groups.remove(g)
+                    if not groups:
+                        return
+                    target = None
+                    if view_id is not None:
+                        target = next((v for v in groups[0].views if v.id() == view_id), None)
+                    SortTask(groups, sort_by, sort_module, reverse, target, self.window).start()
 
-    def sort(self, view_data):
-        """Sort the views."""
+    def get_sort_module(self, module_name):
+        """Import the sort_by module or create a composite of several modules."""
 
-        indexes = tuple([x for x in range(0, len(view_data[0]) - 1)])
-        sorted_views = sorted(view_data, key=itemgetter(*indexes))
-        if self.reverse:
-            sorted_views = sorted_views[::-1]
-        if sorted_views != view_data:
-            for index in range(0, len(sorted_views)):
-                self.window.set_view_index(sorted_views[index][-1], self.group, index)
+        return load_sort_module(module_name)
 
-    def get_sort_module(self, module_name):
-        """Import the sort_by module."""
 
-        import imp
-        path_name = os.path.join("Packages", os.path.normpath(module_name.replace('.', '/')))
-        path_name += ".py"
-        module = imp.new_module(module_name)
-        sys.modules[module_name] = module
-        exec(
-            compile(
-                sublime.load_resource(sublime_format_path(path_name)),
-                module_name, 'exec'
+class TabsExtraLayoutCommand(sublime_plugin.WindowCommand):
+    """Distribute the window's tabs across its groups by a sort key."""
+
+    def run(self, sort_by="TabsExtra.sort.name", reverse=False, partition="even", groups=None, rules=None,
+            default_group=None):
+        """
+        Distribute tabs.
+
+        Tabs are sorted with `sort_by` and then assigned a group by `partition`:
+
+        - `even`: the sorted tabs are split into equal runs across the first
+          `groups` groups (all groups by default).
+        - `key`: each distinct value of the module's first key gets its own group,
+          in sorted order; remaining values share the last group.
+        - `rules`: each rule in `rules` is `{"group": n, "patterns": [...]}`, and a
+          tab goes to the group of the first rule with a matching glob pattern.
+          Patterns without a path separator are matched against the file's base
+          name.  Tabs matching no rule go to `default_group`, or stay in their
+          group if it is not set.
+
+        Within each group, tabs keep the sorted order.
+        """
+
+        sort_by = get_sort_by(sort_by)
+        if sort_by == "" or partition not in ("even", "key", "rules"):
+            return
+        sort_module = load_sort_module(sort_by)
+        if sort_module is None:
+            return
+
+        count = self.window.num_groups()
+        if groups is not None:
+            count = max(1, min(int(groups), count))
+        current = [self.window.views_in_group(g) for g in range(self.window.num_groups())]
+        matchers = [
+            (
+                min(max(int(rule.get("group", 0)), 0), count - 1),
+                [compile_glob(p) for p in rule.get("patterns", [])]
+            ) for rule in (rules or [])
+        ]
+        if default_group is not None:
+            default_group = min(max(int(default_group), 0), count - 1)
+        sublime.set_timeout_async(
+            functools.partial(
+                self.compute, current, sort_module, bool(reverse), partition, count,
+                functools.partial(self.match, matchers, default_group), time.perf_counter()
             ),
-            sys.modules[module_name].__dict__
+            0
+        )
+
+    @staticmethod
+    def match(matchers, default_group, file_name, group):
+        """Get the group of the first matching rule."""
+
+        if file_name:
+            for rule_group, patterns in matchers:
+                if match_globs(patterns, file_name):
+                    return rule_group
+        return group if default_group is None else default_group
+
+    def compute(self, current, sort_module, reverse, partition, count, match, start_time):
+        """Compute the target layout off the UI thread."""
+
+        views = [v for group in current for v in group]
+        if not views:
+            return
+        group_of = {v.id(): g for g, group in enumerate(current) for v in group}
+        context = tab_sort_helper.SortContext(self.window)
+        view_data = []
+        try:
+            tab_sort_helper.run_sort_module(sort_module, views, view_data, context)
+        except Exception as e:
+            log("layout failed - %s" % str(e))
+            return
+        sorted_views = tab_sort_helper.sort_view_data(view_data)
+        if reverse:
+            sorted_views = sorted_views[::-1]
+
+        target = [[] for _ in current]
+        if partition == "even":
+            size = -(-len(sorted_views) // count)
+            for i, entry in enumerate(sorted_views):
+                target[i // size].append(entry[-1].id())
+        elif partition == "key":
+            group = -1
+            last = None
+            for entry in sorted_views:
+                if group == -1 or (entry[0] != last and group < count - 1):
+                    group += 1
+                    last = entry[0]
+                target[group].append(entry[-1].id())
+        else:
+            for entry in sorted_views:
+                view = entry[-1]
+                target[match(context.info(view).file_name, group_of[view.id()])].append(view.id())
+
+        moves = tab_sort_helper.layout_moves([[v.id() for v in group] for group in current], target)
+        sublime.set_timeout(functools.partial(self.apply, current, moves, start_time), 0)
+
+    def apply(self, current, moves, start_time):
+        """Apply the moves on the main thread."""
+
+        window = self.window
+        ids = [[v.id() for v in window.views_in_group(g)] for g in range(window.num_groups())]
+        if ids != [[v.id() for v in group] for group in current]:
+            debug("layout changed while computing, skipping")
+            return
+
+        active_view = window.active_view()
+        views = {v.id(): v for group in current for v in group}
+        for view_id, group, index in moves:
+            window.set_view_index(views[view_id], group, index)
+        for group in range(len(current)):
+            SortGeneration.bump((window.id(), group), 'move')
+        window.focus_view(active_view)
+        debug(
+            "layout: %d moves for %d tabs in %.2f ms" % (
+                len(moves), len(views), (time.perf_counter() - start_time) * 1000
+            )
         )
-        return module
 
 
 ###############################
@@ -1011,3 +2741,26 @@ def plugin_loaded():
         sheet = win.active_sheet()
         if sheet is not None:
             timestamp_view(win, sheet)
+
+    settings = sublime.load_settings(SETTINGS)
+    settings.clear_on_change('tabs_extra_watch_sort')
+    settings.add_on_change('tabs_extra_watch_sort', SortWatcher.refresh)
+    SortWatcher.refresh()
+
+
+def plugin_unloaded():
+    """Handle plugin teardown."""
+
+    SortModuleCache.clear()
+    SortScheduler.cancel()
+    LiveMRU.cancel()
+    TabRecency.clear()
+    Hibernation.clear()
+    CloseJournal.clear()
+    SortWatcher.stop()
+    sublime.load_settings(SETTINGS).clear_on_change('tabs_extra_watch_sort')
+    SortGeneration.clear()
+    SortKeyWarmer.clear()
+    tab_sort_helper.shutdown_executor()
+    tab_sort_helper.StatCache.clear()
+    tab_git.GitStatusCache.clear()
@@ -0,0 +1,16 @@
+"""Pytest configuration."""
+import sys
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Print the sort and close benchmark results if the benchmarks ran."""
+
+    benchmark = sys.modules.get('tests.test_benchmark')
+    if benchmark is not None and benchmark.RESULTS:
+        terminalreporter.section('sort benchmark')
+        for line in benchmark.format_results():
+            terminalreporter.write_line(line)
+    if benchmark is not None and benchmark.CLOSE_RESULTS:
+        terminalreporter.section('close benchmark')
+        for line in benchmark.format_close_results():
+            terminalreporter.write_line(line)
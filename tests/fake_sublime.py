@@ -0,0 +1,835 @@
+"""
+Headless stand-in for the Sublime Text API.
+
+Models windows, groups, sheets, views, and settings well enough to run the
+TabsExtra commands and sort modules outside of Sublime.  Every API call is
+counted so that benchmarks can report how chatty an operation is.
+
+Call `install()` before importing any TabsExtra module.  The modules are then
+importable as `TabsExtra.<name>`.  Each window, view, and sheet is a single
+object, so identity comparison stands in for Sublime's id based equality.
+"""
+import codecs
+import collections
+import functools
+import json
+import os
+import re
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CALLS = collections.Counter()
+
+
+def api(func):
+    """Count calls to the decorated API function."""
+
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        CALLS[name] += 1
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def reset_calls():
+    """Reset the API call counters."""
+
+    CALLS.clear()
+
+
+def total_calls():
+    """Return the total number of API calls."""
+
+    return sum(CALLS.values())
+
+
+def strip_json_comments(text):
+    """Strip comments and dangling commas from Sublime JSON."""
+
+    text = re.sub(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/', lambda m: m.group(0) if m.group(0)[0] == '"' else '', text,
+                  flags=re.DOTALL)
+    return re.sub(r',(\s*[\]}])', r'\1', text)
+
+
+class Region(object):
+    """Region."""
+
+    def __init__(self, a, b=None):
+        """Initialize."""
+
+        self.a = a
+        self.b = a if b is None else b
+
+    def begin(self):
+        """Start of region."""
+
+        return min(self.a, self.b)
+
+    def end(self):
+        """End of region."""
+
+        return max(self.a, self.b)
+
+
+class Selection(list):
+    """Selection."""
+
+    def clear(self):
+        """Clear the selection."""
+
+        del self[:]
+
+    def add(self, region):
+        """Add a region."""
+
+        self.append(region)
+
+
+class Settings(object):
+    """Settings object."""
+
+    def __init__(self, values=None):
+        """Initialize."""
+
+        self._values = dict(values) if values else {}
+        self._callbacks = {}
+
+    @api
+    def get(self, key, default=None):
+        """Get setting."""
+
+        return self._values.get(key, default)
+
+    @api
+    def set(self, key, value):  # noqa: A003
+        """Set setting."""
+
+        self._values[key] = value
+
+    @api
+    def erase(self, key):
+        """Erase setting."""
+
+        self._values.pop(key, None)
+
+    @api
+    def has(self, key):
+        """Check setting."""
+
+        return key in self._values
+
+    @api
+    def add_on_change(self, tag, callback):
+        """Add a change callback."""
+
+        self._callbacks[tag] = callback
+
+    @api
+    def clear_on_change(self, tag):
+        """Clear a change callback."""
+
+        self._callbacks.pop(tag, None)
+
+
+class Sheet(object):
+    """Sheet."""
+
+    def __init__(self, view):
+        """Initialize."""
+
+        self._view = view
+
+    @api
+    def id(self):  # noqa: A003
+        """Sheet id."""
+
+        return self._view._id
+
+    @api
+    def view(self):
+        """Sheet's view."""
+
+        return self._view
+
+    @api
+    def window(self):
+        """Sheet's window."""
+
+        return self._view._window
+
+
+class View(object):
+    """View."""
+
+    _next_id = 1
+
+    def __init__(self, file_name=None, text='', dirty=False, encoding='UTF-8', line_endings='Unix', syntax=''):
+        """Initialize."""
+
+        self._id = View._next_id
+        View._next_id += 1
+        self._file_name = file_name
+        self._text = text
+        self._dirty = dirty
+        self._scratch = False
+        self._encoding = encoding
+        self._line_endings = line_endings
+        self._settings = Settings({'syntax': syntax})
+        self._sel = Selection([Region(0)])
+        self._viewport = (0.0, 0.0)
+        self._window = None
+        self._group = -1
+        self._sheet = Sheet(self)
+        VIEWS[self._id] = self
+
+    def __repr__(self):
+        """Representation."""
+
+        return 'View(%d, %r)' % (self._id, self._file_name)
+
+    @api
+    def id(self):  # noqa: A003
+        """View id."""
+
+        return self._id
+
+    @api
+    def is_valid(self):
+        """Check if the view is still open."""
+
+        return self._window is not None
+
+    @api
+    def window(self):
+        """View's window."""
+
+        return self._window
+
+    @api
+    def sheet(self):
+        """View's sheet."""
+
+        return self._sheet
+
+    @api
+    def file_name(self):
+        """File name."""
+
+        return self._file_name
+
+    @api
+    def retarget(self, file_name):
+        """Change the file name."""
+
+        self._file_name = file_name
+
+    @api
+    def is_dirty(self):
+        """Check if dirty."""
+
+        return self._dirty
+
+    @api
+    def is_loading(self):
+        """Check if loading."""
+
+        return False
+
+    @api
+    def set_scratch(self, value):
+        """Set scratch."""
+
+        self._scratch = value
+
+    @api
+    def settings(self):
+        """View settings."""
+
+        return self._settings
+
+    @api
+    def sel(self):
+        """Selection."""
+
+        return self._sel
+
+    @api
+    def viewport_position(self):
+        """Scroll position."""
+
+        return self._viewport
+
+    @api
+    def set_viewport_position(self, xy, animate=True):
+        """Scroll to the position."""
+
+        self._viewport = tuple(xy)
+
+    @api
+    def assign_syntax(self, syntax):
+        """Assign the syntax."""
+
+        self._settings.set('syntax', syntax)
+
+    @api
+    def size(self):
+        """Buffer size."""
+
+        return len(self._text)
+
+    @api
+    def substr(self, region):
+        """Get text in region."""
+
+        return self._text[region.begin():region.end()]
+
+    @api
+    def encoding(self):
+        """Encoding."""
+
+        return self._encoding
+
+    @api
+    def line_endings(self):
+        """Line endings."""
+
+        return self._line_endings
+
+    @api
+    def rowcol(self, pt):
+        """Row and column of point."""
+
+        row = self._text.count('\n', 0, pt)
+        return row, pt - (self._text.rfind('\n', 0, pt) + 1)
+
+    @api
+    def close(self):
+        """Close the view."""
+
+        if self._window is not None:
+            self._window._close(self)
+        return True
+
+    @api
+    def run_command(self, cmd, args=None):
+        """Run a text command."""
+
+        _run_command(cmd, args, view=self)
+
+
+class Window(object):
+    """Window."""
+
+    _next_id = 1
+
+    def __init__(self, num_groups=1, folders=None):
+        """Initialize."""
+
+        self._id = Window._next_id
+        Window._next_id += 1
+        self._groups = [[] for _ in range(num_groups)]
+        self._active_group = 0
+        self._active = [None] * num_groups
+        self._folders = list(folders) if folders else []
+        self._settings = Settings()
+        self._valid = True
+        WINDOWS.append(self)
+
+    # Helpers not part of the API.
+    def add_view(self, view, group=0, activate=True):
+        """Add a view to a group."""
+
+        view._window = self
+        view._group = group
+        self._groups[group].append(view)
+        if activate or self._active[group] is None:
+            self._active[group] = view
+            self._active_group = group
+        return view
+
+    def _close(self, view):
+        """Remove a view."""
+
+        if view._window is not self:
+            return False
+        group = view._group
+        views = self._groups[group]
+        index = views.index(view)
+        del views[index]
+        view._window = None
+        view._group = -1
+        if self._active[group] is view:
+            self._active[group] = views[min(index, len(views) - 1)] if views else None
+        return True
+
+    @api
+    def id(self):  # noqa: A003
+        """Window id."""
+
+        return self._id
+
+    @api
+    def is_valid(self):
+        """Check if the window is valid."""
+
+        return self._valid
+
+    @api
+    def settings(self):
+        """Window settings."""
+
+        return self._settings
+
+    @api
+    def folders(self):
+        """Project folders."""
+
+        return list(self._folders)
+
+    @api
+    def num_groups(self):
+        """Number of groups."""
+
+        return len(self._groups)
+
+    @api
+    def active_group(self):
+        """Active group."""
+
+        return self._active_group
+
+    @api
+    def focus_group(self, group):
+        """Focus group."""
+
+        self._active_group = group
+
+    @api
+    def views(self):
+        """All views."""
+
+        return [v for g in self._groups for v in g]
+
+    @api
+    def views_in_group(self, group):
+        """Views in group."""
+
+        return list(self._groups[group])
+
+    @api
+    def sheets(self):
+        """All sheets."""
+
+        return [v._sheet for g in self._groups for v in g]
+
+    @api
+    def sheets_in_group(self, group):
+        """Sheets in group."""
+
+        return [v._sheet for v in self._groups[group]]
+
+    @api
+    def active_view(self):
+        """Active view."""
+
+        return self._active[self._active_group]
+
+    @api
+    def active_view_in_group(self, group):
+        """Active view in group."""
+
+        return self._active[group]
+
+    @api
+    def active_sheet(self):
+        """Active sheet."""
+
+        view = self._active[self._active_group]
+        return view._sheet if view is not None else None
+
+    @api
+    def active_sheet_in_group(self, group):
+        """Active sheet in group."""
+
+        view = self._active[group]
+        return view._sheet if view is not None else None
+
+    @api
+    def get_view_index(self, view):
+        """Get view's group and index."""
+
+        if view is None or view._window is not self:
+            return -1, -1
+        return view._group, self._groups[view._group].index(view)
+
+    @api
+    def get_sheet_index(self, sheet):
+        """Get sheet's group and index."""
+
+        return self.get_view_index(sheet._view) if sheet is not None else (-1, -1)
+
+    @api
+    def set_view_index(self, view, group, index):
+        """Move a view."""
+
+        if view._window is self and view._group == group:
+            self._groups[group].remove(view)
+        elif view._window is not None:
+            view._window._close(view)
+        view._window = self
+        view._group = group
+        self._groups[group].insert(index, view)
+        if self._active[group] is None:
+            self._active[group] = view
+
+    @api
+    def focus_view(self, view):
+        """Focus a view."""
+
+        if view is None:
+            return
+        group = self.get_view_index(view)[0]
+        if group != -1:
+            self._active[group] = view
+            self._active_group = group
+            _fire('on_activated', view)
+
+    @api
+    def focus_sheet(self, sheet):
+        """Focus a sheet."""
+
+        if sheet is not None:
+            self.focus_view(sheet._view)
+
+    @api
+    def find_open_file(self, file_name):
+        """Find an open file."""
+
+        for v in self.views():
+            if v._file_name == file_name:
+                return v
+        return None
+
+    @api
+    def open_file(self, file_name, flags=0, group=-1):
+        """Open a file."""
+
+        view = self.find_open_file(file_name)
+        if view is None:
+            text = ''
+            if os.path.isfile(file_name):
+                with open(file_name) as f:
+                    text = f.read()
+            view = View(file_name, text=text)
+            self.add_view(view, self._active_group if group == -1 else group)
+            _fire('on_load', view)
+        else:
+            self.focus_view(view)
+        return view
+
+    @api
+    def run_command(self, cmd, args=None):
+        """Run a window command."""
+
+        _run_command(cmd, args, window=self)
+
+    @api
+    def show_quick_panel(self, items, on_select, flags=0, selected_index=-1, on_highlight=None):
+        """Show a quick panel; selections can be queued via `QUICK_PANEL_SELECTIONS`."""
+
+        QUICK_PANEL.append(items)
+        on_select(QUICK_PANEL_SELECTIONS.pop(0) if QUICK_PANEL_SELECTIONS else -1)
+
+
+WINDOWS = []
+VIEWS = {}
+SETTINGS = {}
+QUICK_PANEL = []
+QUICK_PANEL_SELECTIONS = []
+# Callbacks are run immediately unless their kind (`timeout` or `async`) is in
+# `DEFER`, in which case they are queued until `run_queued` is called.
+DEFER = set()
+TIMEOUT_QUEUE = []
+ASYNC_QUEUE = []
+CLIPBOARD = ['']
+MESSAGES = []
+# Resources outside of `Packages/TabsExtra`: `{'Packages/User/sort.py': source}`.
+RESOURCES = {}
+
+
+def reset():
+    """Reset windows, settings, and counters."""
+
+    del WINDOWS[:]
+    VIEWS.clear()
+    SETTINGS.clear()
+    del QUICK_PANEL[:]
+    del QUICK_PANEL_SELECTIONS[:]
+    DEFER.clear()
+    del TIMEOUT_QUEUE[:]
+    del ASYNC_QUEUE[:]
+    del MESSAGES[:]
+    RESOURCES.clear()
+    reset_calls()
+
+
+@api
+def version():
+    """Sublime version."""
+
+    return '4200'
+
+
+@api
+def platform():
+    """Platform."""
+
+    return 'windows' if sys.platform.startswith('win') else ('osx' if sys.platform == 'darwin' else 'linux')
+
+
+@api
+def load_settings(name):
+    """Load settings, using the package's settings file for defaults."""
+
+    if name not in SETTINGS:
+        values = {}
+        pth = os.path.join(ROOT, name)
+        if os.path.exists(pth):
+            with codecs.open(pth, 'r', encoding='utf-8') as f:
+                values = json.loads(strip_json_comments(f.read()))
+        SETTINGS[name] = Settings(values)
+    return SETTINGS[name]
+
+
+@api
+def load_resource(name):
+    """Load a resource from `Packages/TabsExtra` or `RESOURCES`."""
+
+    if name in RESOURCES:
+        return RESOURCES[name]
+    parts = name.split('/')
+    if parts[:2] != ['Packages', 'TabsExtra']:
+        raise IOError('resource not found: %s' % name)
+    with codecs.open(os.path.join(ROOT, *parts[2:]), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@api
+def windows():
+    """All windows."""
+
+    return [w for w in WINDOWS if w._valid]
+
+
+@api
+def active_window():
+    """Active window."""
+
+    return WINDOWS[0] if WINDOWS else None
+
+
+@api
+def set_timeout(callback, delay=0):
+    """Run the callback immediately, or queue it if timeouts are deferred."""
+
+    if 'timeout' in DEFER:
+        TIMEOUT_QUEUE.append(callback)
+    else:
+        callback()
+
+
+@api
+def set_timeout_async(callback, delay=0):
+    """Run the callback immediately, or queue it if async callbacks are deferred."""
+
+    if 'async' in DEFER:
+        ASYNC_QUEUE.append(callback)
+    else:
+        callback()
+
+
+def run_queued(queue):
+    """Run the queued callbacks in order, including any queued while running, and return how many ran."""
+
+    count = 0
+    while queue:
+        queue.pop(0)()
+        count += 1
+    return count
+
+
+@api
+def status_message(msg):
+    """Status message."""
+
+
+@api
+def error_message(msg):
+    """Show an error message."""
+
+    MESSAGES.append(msg)
+
+
+def ok_cancel_dialog(msg, ok_title=""):
+    """Always accept."""
+
+    return True
+
+
+@api
+def get_clipboard():
+    """Get clipboard."""
+
+    return CLIPBOARD[0]
+
+
+@api
+def set_clipboard(text):
+    """Set clipboard."""
+
+    CLIPBOARD[0] = text
+
+
+###############################
+# sublime_plugin
+###############################
+COMMANDS = {}
+LISTENERS = []
+
+
+def _command_name(cls):
+    """Convert a command class name to its command name."""
+
+    name = cls.__name__
+    if name.endswith('Command'):
+        name = name[:-7]
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+
+class Command(object):
+    """Base command."""
+
+    def __init_subclass__(cls, **kwargs):
+        """Register the command."""
+
+        super().__init_subclass__(**kwargs)
+        COMMANDS[_command_name(cls)] = cls
+
+
+class WindowCommand(Command):
+    """Window command."""
+
+    def __init__(self, window):
+        """Initialize."""
+
+        self.window = window
+
+
+class TextCommand(Command):
+    """Text command."""
+
+    def __init__(self, view):
+        """Initialize."""
+
+        self.view = view
+
+
+class ApplicationCommand(Command):
+    """Application command."""
+
+
+class EventListener(object):
+    """Event listener."""
+
+    def __init_subclass__(cls, **kwargs):
+        """Register the listener."""
+
+        super().__init_subclass__(**kwargs)
+        LISTENERS.append(cls)
+
+
+def _fire(event, *args):
+    """Send an event to the registered listeners."""
+
+    for cls in list(LISTENERS):
+        handler = getattr(cls(), event, None)
+        if handler is not None:
+            handler(*args)
+
+
+def fire(event, *args):
+    """Send an event to the registered listeners."""
+
+    _fire(event, *args)
+
+
+def _run_command(cmd, args, window=None, view=None):
+    """Run a registered command."""
+
+    cls = COMMANDS.get(cmd)
+    if cls is None:
+        return
+    args = dict(args) if args else {}
+    if issubclass(cls, WindowCommand):
+        cls(window if window is not None else view._window).run(**args)
+    elif issubclass(cls, TextCommand):
+        cls(view if view is not None else window.active_view()).run(None, **args)
+    else:
+        cls().run(**args)
+
+
+def install():
+    """Install the fake `sublime`, `sublime_plugin`, and `sublime_api` modules and the `TabsExtra` package."""
+
+    if 'sublime' in sys.modules and getattr(sys.modules['sublime'], '__fake__', False):
+        return
+
+    sublime = types.ModuleType('sublime')
+    sublime.__fake__ = True
+    for name in (
+        'Region', 'Settings', 'Sheet', 'View', 'Window', 'version', 'platform', 'load_settings', 'load_resource',
+        'windows', 'active_window', 'set_timeout', 'set_timeout_async', 'status_message', 'error_message',
+        'ok_cancel_dialog', 'get_clipboard', 'set_clipboard'
+    ):
+        setattr(sublime, name, globals()[name])
+    sys.modules['sublime'] = sublime
+
+    sublime_plugin = types.ModuleType('sublime_plugin')
+    for name in ('WindowCommand', 'TextCommand', 'ApplicationCommand', 'EventListener'):
+        setattr(sublime_plugin, name, globals()[name])
+    sys.modules['sublime_plugin'] = sublime_plugin
+
+    sublime_api = types.ModuleType('sublime_api')
+
+    @api
+    def window_close_file(window_id, view_id, callback=None):
+        """Close a file."""
+
+        v = VIEWS.get(view_id)
+        if v is not None and v._window is not None and v._window._id == window_id:
+            _fire('on_pre_close', v)
+            v._window._close(v)
+            _fire('on_close', v)
+            if callback is not None:
+                callback(True)
+
+    @api
+    def sheet_close(sheet_id, callback=None):
+        """Close a sheet."""
+
+        v = VIEWS.get(sheet_id)
+        if v is not None and v._window is not None:
+            window_close_file(v._window._id, v._id, callback)
+
+    sublime_api.window_close_file = window_close_file
+    sublime_api.sheet_close = sheet_close
+    sys.modules['sublime_api'] = sublime_api
+
+    package = types.ModuleType('TabsExtra')
+    package.__path__ = [ROOT]
+    sys.modules['TabsExtra'] = package
@@ -0,0 +1,223 @@
+"""
+Benchmark sorting and closing with the fake Sublime API.
+
+Each module in the default `sort_layout` is run at several group sizes, both on
+its own (key computation) and through `TabsExtraSortCommand`.  Wall time, API
+calls, and `set_view_index` moves are collected and printed at the end of the
+test session.  "Close Other Tabs" is timed with and without `close_batch`.
+
+The benchmarks take a while, so they only run if the `TABSEXTRA_BENCHMARK`
+environment variable is set.
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+import unittest
+from . import fake_sublime
+
+fake_sublime.install()
+
+from TabsExtra import tab_sort_helper  # noqa: E402
+from TabsExtra import tabs_extra  # noqa: E402
+
+SIZES = (100, 1000, 10000)
+CLOSE_SIZES = (500, 5000)
+
+RESULTS = []
+CLOSE_RESULTS = []
+
+BENCHMARK = bool(os.environ.get('TABSEXTRA_BENCHMARK'))
+SKIP_REASON = 'set TABSEXTRA_BENCHMARK=1 to run the benchmarks'
+
+
+@unittest.skipUnless(BENCHMARK, SKIP_REASON)
+class TestSortBenchmark(unittest.TestCase):
+    """Benchmark the sort modules and sort command."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the files the tabs point to."""
+
+        cls.tempdir = tempfile.mkdtemp()
+        rand = random.Random(0)
+        cls.files = []
+        now = time.time()
+        for i in range(max(SIZES)):
+            folder = os.path.join(cls.tempdir, 'dir%d' % (i % 50))
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+            pth = os.path.join(folder, 'file%d.%s' % (i, ('py', 'md', 'txt', 'json')[i % 4]))
+            with open(pth, 'wb') as f:
+                f.write(b'x' * rand.randint(0, 2048))
+            stamp = now - rand.randint(0, 100000)
+            os.utime(pth, (stamp, stamp))
+            cls.files.append(pth)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the files."""
+
+        shutil.rmtree(cls.tempdir)
+
+    def setUp(self):
+        """Reset the fake API."""
+
+        fake_sublime.reset()
+        tab_sort_helper.StatCache.clear()
+        tabs_extra.SortTask.keys.clear()
+
+    def make_window(self, count):
+        """Create a window with `count` tabs in random order, a few of which are unsaved."""
+
+        rand = random.Random(count)
+        window = fake_sublime.Window()
+        files = self.files[:count]
+        rand.shuffle(files)
+        syntaxes = ('Python', 'Markdown', 'Plain Text', 'JSON')
+        for i, pth in enumerate(files):
+            if i % 20 == 0:
+                view = fake_sublime.View(None, text='unsaved %d\n' % i * rand.randint(1, 20), dirty=True)
+            else:
+                view = fake_sublime.View(pth, syntax='Packages/%s.sublime-syntax' % syntaxes[i % 4])
+            view.settings().set('tabs_extra_last_activated', rand.random() * 1000)
+            window.add_view(view, activate=False)
+        return window
+
+    def bench(self, entry, count):
+        """Benchmark a sort layout entry."""
+
+        module_name = entry['module']
+        reverse = bool(entry.get('reverse', False))
+        window = self.make_window(count)
+        sort_module = tabs_extra.SortModuleCache.get(module_name)
+        views = window.views_in_group(0)
+
+        # Key computation on its own
+        fake_sublime.reset_calls()
+        start = time.perf_counter()
+        view_data = []
+        context = tab_sort_helper.SortContext(window, views)
+        tab_sort_helper.run_sort_module(sort_module, views, view_data, context)
+        keys_time = time.perf_counter() - start
+        keys_calls = fake_sublime.total_calls()
+        expected = [x[-1] for x in tab_sort_helper.sort_view_data(view_data)]
+        if reverse:
+            expected = expected[::-1]
+
+        # Whole command
+        tab_sort_helper.StatCache.clear()
+        fake_sublime.reset_calls()
+        start = time.perf_counter()
+        window.run_command('tabs_extra_sort', {'sort_by': module_name, 'reverse': reverse})
+        sort_time = time.perf_counter() - start
+        sort_calls = fake_sublime.total_calls()
+        moves = fake_sublime.CALLS['Window.set_view_index']
+
+        self.assertEqual([v.id() for v in window.views_in_group(0)], [v.id() for v in expected])
+        self.assertLessEqual(moves, count)
+
+        RESULTS.append(
+            {
+                'module': module_name,
+                'tabs': count,
+                'keys_ms': keys_time * 1000,
+                'keys_calls': keys_calls,
+                'sort_ms': sort_time * 1000,
+                'sort_calls': sort_calls,
+                'moves': moves
+            }
+        )
+
+    def run_layout(self, count):
+        """Benchmark every entry of the default sort layout."""
+
+        for entry in fake_sublime.load_settings(tabs_extra.SETTINGS).get('sort_layout', []):
+            with self.subTest(module=entry['module'], tabs=count):
+                self.bench(entry, count)
+
+    def test_sort_100(self):
+        """Benchmark 100 tabs."""
+
+        self.run_layout(SIZES[0])
+
+    def test_sort_1000(self):
+        """Benchmark 1,000 tabs."""
+
+        self.run_layout(SIZES[1])
+
+    def test_sort_10000(self):
+        """Benchmark 10,000 tabs."""
+
+        self.run_layout(SIZES[2])
+
+
+@unittest.skipUnless(BENCHMARK, SKIP_REASON)
+class TestCloseBenchmark(unittest.TestCase):
+    """Benchmark closing other tabs."""
+
+    def bench(self, count, batch):
+        """Close every tab but one in a group of `count` tabs."""
+
+        fake_sublime.reset()
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('close_batch', batch)
+        window = fake_sublime.Window()
+        for i in range(count):
+            window.add_view(fake_sublime.View('/missing/%d.txt' % i), activate=False)
+        window.focus_view(window.views_in_group(0)[count // 2])
+
+        fake_sublime.reset_calls()
+        start = time.perf_counter()
+        window.run_command('tabs_extra_close', {'group': 0, 'index': count // 2, 'close_type': 'other'})
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(window.views_in_group(0)), 1)
+        CLOSE_RESULTS.append(
+            {
+                'mode': 'batch' if batch else 'focus each',
+                'tabs': count,
+                'ms': elapsed * 1000,
+                'calls': fake_sublime.total_calls(),
+                'focus': fake_sublime.CALLS['Window.focus_view'],
+                'settings': fake_sublime.CALLS['Settings.set']
+            }
+        )
+
+    def test_close(self):
+        """Benchmark closing with and without batching."""
+
+        for count in CLOSE_SIZES:
+            for batch in (False, True):
+                with self.subTest(tabs=count, batch=batch):
+                    self.bench(count, batch)
+
+
+def format_results():
+    """Format the collected results as a table."""
+
+    lines = [
+        '%-28s %7s %10s %10s %10s %10s %7s' % (
+            'module', 'tabs', 'keys ms', 'keys api', 'sort ms', 'sort api', 'moves'
+        )
+    ]
+    for r in RESULTS:
+        lines.append(
+            '%-28s %7d %10.1f %10d %10.1f %10d %7d' % (
+                r['module'], r['tabs'], r['keys_ms'], r['keys_calls'], r['sort_ms'], r['sort_calls'], r['moves']
+            )
+        )
+    return lines
+
+
+def format_close_results():
+    """Format the collected close results as a table."""
+
+    lines = ['%-28s %7s %10s %10s %10s %10s' % ('mode', 'tabs', 'ms', 'api', 'focus', 'set')]
+    for r in CLOSE_RESULTS:
+        lines.append(
+            '%-28s %7d %10.1f %10d %10d %10d' % (
+                r['mode'], r['tabs'], r['ms'], r['calls'], r['focus'], r['settings']
+            )
+        )
+    return lines
@@ -0,0 +1,401 @@
+"""Test the close command."""
+import os
+import tempfile
+import unittest
+from . import fake_sublime
+
+fake_sublime.install()
+
+from TabsExtra import tabs_extra  # noqa: E402
+
+
+class TestClose(unittest.TestCase):
+    """Test closing tabs."""
+
+    def setUp(self):
+        """Create a window with a group of tabs."""
+
+        fake_sublime.reset()
+        self.window = fake_sublime.Window()
+        self.views = [
+            self.window.add_view(fake_sublime.View('/missing/%d.txt' % i), activate=False) for i in range(20)
+        ]
+        self.window.focus_view(self.views[5])
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('close_batch', True)
+
+    def close(self, close_type, index=5, **kwargs):
+        """Run the close command."""
+
+        args = {'group': 0, 'index': index, 'close_type': close_type}
+        args.update(kwargs)
+        fake_sublime.reset_calls()
+        self.window.run_command('tabs_extra_close', args)
+
+    def test_batch_close_other(self):
+        """Test that closing other tabs doesn't focus each tab."""
+
+        self.views[2].settings().set('tabs_extra_sticky', True)
+        self.close('other')
+        self.assertEqual(self.window.views_in_group(0), [self.views[2], self.views[5]])
+        self.assertIs(self.window.active_view(), self.views[5])
+        # Focus is only restored once at the end.
+        self.assertEqual(fake_sublime.CALLS['Window.focus_sheet'], 1)
+        self.assertEqual(fake_sublime.CALLS['Window.focus_view'], 1)
+
+    def test_batch_close_restores_active(self):
+        """Test that the active tab stays focused when closing tabs relative to another tab."""
+
+        self.close('right', index=10)
+        self.assertEqual(len(self.window.views_in_group(0)), 11)
+        self.assertIs(self.window.active_view(), self.views[5])
+
+    def test_batch_close_unsaved(self):
+        """Test that unsaved tabs are skipped, and only shown if they will prompt."""
+
+        self.views[8]._dirty = True
+        self.close('other', close_unsaved=False)
+        self.assertEqual(self.window.views_in_group(0), [self.views[5], self.views[8]])
+        self.assertEqual(fake_sublime.CALLS['Window.focus_view'], 1)
+
+        self.close('other', index=0)
+        self.assertEqual(self.window.views_in_group(0), [self.views[5]])
+        self.assertEqual(fake_sublime.CALLS['Window.focus_view'], 2)
+
+    def test_no_group(self):
+        """Test that nothing is closed or focused without a group, even after an earlier close."""
+
+        self.close('right', index=10)
+        self.window.focus_view(self.views[2])
+        self.close('other', index=7, group=-1)
+        self.assertEqual(len(self.window.views_in_group(0)), 11)
+        self.assertIs(self.window.active_view(), self.views[2])
+        self.assertEqual(fake_sublime.CALLS['Window.focus_sheet'], 0)
+
+    def test_focus_each(self):
+        """Test that each tab is focused when batch closing is disabled."""
+
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('close_batch', False)
+        self.close('other')
+        self.assertEqual(self.window.views_in_group(0), [self.views[5]])
+        self.assertEqual(fake_sublime.CALLS['Window.focus_view'], 19)
+
+
+class TestCloseMatching(unittest.TestCase):
+    """Test closing tabs by predicate."""
+
+    def setUp(self):
+        """Create a window with two groups of tabs."""
+
+        fake_sublime.reset()
+        self.window = fake_sublime.Window(2, folders=['/proj'])
+        for group, names in enumerate(
+            (
+                ('/proj/a.py', '/proj/out.log', '/tmp/b.log', '/proj/gen/c.py', '/tmp/d.py'),
+                ('/proj/e.log', '/tmp/f.txt')
+            )
+        ):
+            for name in names:
+                self.window.add_view(fake_sublime.View(name), group, activate=False)
+        self.window.focus_view(self.window.views_in_group(0)[0])
+
+    def close(self, **kwargs):
+        """Run the close command."""
+
+        fake_sublime.reset_calls()
+        self.window.run_command('tabs_extra_close_matching', kwargs)
+
+    def names(self, group=0):
+        """Get the file names of the group."""
+
+        return [v.file_name() for v in self.window.views_in_group(group)]
+
+    def test_extension(self):
+        """Test closing by extension in the active group."""
+
+        self.close(extensions=['log'])
+        self.assertEqual(self.names(), ['/proj/a.py', '/proj/gen/c.py', '/tmp/d.py'])
+        self.assertEqual(self.names(1), ['/proj/e.log', '/tmp/f.txt'])
+
+    def test_window_patterns(self):
+        """Test closing by glob across the window, restoring focus once."""
+
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('close_batch', True)
+        self.close(scope='window', patterns=['*.log', '/proj/gen/*'])
+        self.assertEqual(self.names(), ['/proj/a.py', '/tmp/d.py'])
+        self.assertEqual(self.names(1), ['/tmp/f.txt'])
+        self.assertEqual(fake_sublime.CALLS['Window.focus_sheet'], 1)
+
+    def test_combined(self):
+        """Test that every predicate must match, and sticky and unsaved tabs are respected."""
+
+        views = self.window.views_in_group(0)
+        views[2].settings().set('tabs_extra_sticky', True)
+        views[4]._dirty = True
+        self.close(regex=r'\.(py|log)$', outside_project=True, clean_only=True)
+        self.assertEqual(self.names(), ['/proj/a.py', '/proj/out.log', '/tmp/b.log', '/proj/gen/c.py', '/tmp/d.py'])
+
+        self.close(regex=r'\.(py|log)$', outside_project=True)
+        self.assertEqual(self.names(), ['/proj/a.py', '/proj/out.log', '/proj/gen/c.py'])
+
+    def test_inactive(self):
+        """Test closing tabs that haven't been activated recently."""
+
+        views = self.window.views_in_group(0)
+        for view in [views[1], views[3]] + self.window.views_in_group(1):
+            view.settings().set('tabs_extra_last_activated', 1)
+        # Tabs that were never activated are kept, even once they have loaded.
+        fake_sublime.fire('on_load', views[2])
+        self.close(scope='window', inactive_minutes=5)
+        self.assertEqual(self.names(), ['/proj/a.py', '/tmp/b.log', '/tmp/d.py'])
+        self.assertEqual(self.names(1), [])
+
+    def test_invalid_regex(self):
+        """Test that an invalid regular expression is reported instead of raised."""
+
+        self.close(regex='(')
+        self.assertEqual(len(fake_sublime.MESSAGES), 1)
+        self.assertEqual(len(self.names()), 5)
+
+    def test_no_predicates(self):
+        """Test that nothing is closed without predicates."""
+
+        self.close(scope='window')
+        self.assertEqual(len(self.names()) + len(self.names(1)), 7)
+
+
+class TestTabBudget(unittest.TestCase):
+    """Test closing the least recently used tabs over the budget."""
+
+    def setUp(self):
+        """Create a window and enable the budget."""
+
+        fake_sublime.reset()
+        tabs_extra.TabRecency.clear()
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('tab_budget', 4)
+        self.window = fake_sublime.Window(2)
+
+    def tearDown(self):
+        """Forget the windows."""
+
+        tabs_extra.TabRecency.clear()
+
+    def open(self, name, group=0):
+        """Open and activate a file."""
+
+        view = self.window.add_view(fake_sublime.View('/missing/%s' % name), group, activate=False)
+        self.window.focus_view(view)
+        fake_sublime.fire('on_load', view)
+        return view
+
+    def names(self, group=0):
+        """Get the base names of the group's files."""
+
+        return [v.file_name()[9:] for v in self.window.views_in_group(group)]
+
+    def test_window_budget(self):
+        """Test the least recently activated clean tabs are closed."""
+
+        views = [self.open(name) for name in ('a', 'b', 'c', 'd')]
+        self.window.focus_view(views[0])
+        views[1].settings().set('tabs_extra_sticky', True)
+        views[2]._dirty = True
+        self.open('e')
+        self.assertEqual(self.names(), ['a', 'b', 'c', 'e'])
+        self.open('f')
+        self.assertEqual(self.names(), ['b', 'c', 'e', 'f'])
+
+    def test_group_budget(self):
+        """Test the budget applies to each group."""
+
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('tab_budget_scope', 'group')
+        for name in ('a', 'b', 'c', 'd'):
+            self.open(name)
+        for name in ('e', 'f', 'g'):
+            self.open(name, 1)
+        self.assertEqual(self.names(), ['a', 'b', 'c', 'd'])
+        self.open('h')
+        self.assertEqual(self.names(), ['b', 'c', 'd', 'h'])
+        self.assertEqual(self.names(1), ['e', 'f', 'g'])
+
+    def test_seeded_from_timestamps(self):
+        """Test tabs opened before the budget was enabled are ordered by activation time."""
+
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('tab_budget', 0)
+        for name in ('a', 'b', 'c', 'd'):
+            view = self.window.add_view(fake_sublime.View('/missing/%s' % name), activate=False)
+            view.settings().set('tabs_extra_last_activated', {'a': 3, 'b': 1, 'c': 4, 'd': 2}[name])
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('tab_budget', 3)
+        self.open('e')
+        self.assertEqual(self.names(), ['a', 'c', 'e'])
+
+
+class TestHibernate(unittest.TestCase):
+    """Test hibernating and restoring tabs."""
+
+    def setUp(self):
+        """Create a window with two groups of real files."""
+
+        fake_sublime.reset()
+        tabs_extra.Hibernation.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.window = fake_sublime.Window(2)
+        for group, names in enumerate((('a', 'b', 'c', 'd'), ('e', 'f'))):
+            for name in names:
+                path = os.path.join(self.tmp.name, name)
+                with open(path, 'w') as f:
+                    f.write('0123456789' * 10)
+                self.window.add_view(fake_sublime.View(path, text='0123456789' * 10), group, activate=False)
+        self.window.focus_view(self.window.views_in_group(1)[0])
+        self.window.focus_view(self.window.views_in_group(0)[1])
+
+    def tearDown(self):
+        """Remove the files."""
+
+        tabs_extra.Hibernation.clear()
+        self.tmp.cleanup()
+
+    def names(self, group=0):
+        """Get the base names of the group's files."""
+
+        return [os.path.basename(v.file_name()) for v in self.window.views_in_group(group)]
+
+    def test_hibernate_restore_all(self):
+        """Test clean tabs are hibernated and restored with their state at their original positions."""
+
+        views = self.window.views_in_group(0)
+        views[0].settings().set('tabs_extra_sticky', True)
+        views[2]._dirty = True
+        views[3].sel().clear()
+        views[3].sel().add(fake_sublime.Region(5, 8))
+        views[3].set_viewport_position((0.0, 40.0))
+        views[3].assign_syntax('Packages/Python/Python.sublime-syntax')
+
+        self.window.run_command('tabs_extra_hibernate', {'scope': 'window'})
+        self.assertEqual(self.names(), ['a', 'b', 'c'])
+        self.assertEqual(self.names(1), ['e'])
+        self.assertEqual([os.path.basename(s['file']) for s in tabs_extra.Hibernation.get(self.window)], ['d', 'f'])
+
+        self.window.run_command('tabs_extra_restore_hibernated', {'restore_all': True})
+        self.assertEqual(self.names(), ['a', 'b', 'c', 'd'])
+        self.assertEqual(self.names(1), ['e', 'f'])
+        self.assertEqual(tabs_extra.Hibernation.get(self.window), [])
+        self.assertEqual(os.path.basename(self.window.active_view().file_name()), 'b')
+
+        view = self.window.views_in_group(0)[3]
+        self.assertEqual([(r.a, r.b) for r in view.sel()], [(5, 8)])
+        self.assertEqual(view.viewport_position(), (0.0, 40.0))
+        self.assertEqual(view.settings().get('syntax'), 'Packages/Python/Python.sublime-syntax')
+
+    def test_restore_one(self):
+        """Test restoring a single tab from the quick panel."""
+
+        self.window.run_command('tabs_extra_hibernate')
+        self.assertEqual(self.names(), ['b'])
+        fake_sublime.QUICK_PANEL_SELECTIONS.append(2)
+        self.window.run_command('tabs_extra_restore_hibernated')
+        self.assertEqual(fake_sublime.QUICK_PANEL[-1][0], ['Restore All', '3 hibernated tabs'])
+        self.assertEqual(self.names(), ['b', 'c'])
+        self.assertEqual(os.path.basename(self.window.active_view().file_name()), 'c')
+        self.assertEqual([os.path.basename(s['file']) for s in tabs_extra.Hibernation.get(self.window)], ['a', 'd'])
+
+    def test_skip_missing(self):
+        """Test files deleted while hibernated are skipped."""
+
+        self.window.run_command('tabs_extra_hibernate')
+        os.remove(os.path.join(self.tmp.name, 'a'))
+        self.window.run_command('tabs_extra_restore_hibernated', {'restore_all': True})
+        self.assertEqual(self.names(), ['b', 'c', 'd'])
+
+
+class TestCloseJournal(unittest.TestCase):
+    """Test reopening the tabs closed by one close operation."""
+
+    def setUp(self):
+        """Create a window with a group of real files."""
+
+        fake_sublime.reset()
+        tabs_extra.CloseJournal.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.window = fake_sublime.Window()
+        for i in range(10):
+            path = os.path.join(self.tmp.name, '%d.txt' % i)
+            with open(path, 'w') as f:
+                f.write('text')
+            self.window.add_view(fake_sublime.View(path, text='text'), activate=False)
+        self.window.focus_view(self.window.views_in_group(0)[3])
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('close_batch', True)
+
+    def tearDown(self):
+        """Remove the files."""
+
+        tabs_extra.CloseJournal.clear()
+        self.tmp.cleanup()
+
+    def names(self):
+        """Get the base names of the group's files."""
+
+        return [os.path.basename(v.file_name())[:-4] for v in self.window.views_in_group(0)]
+
+    def close(self, close_type, index=3):
+        """Run the close command."""
+
+        self.window.run_command('tabs_extra_close', {'group': 0, 'index': index, 'close_type': close_type})
+
+    def test_reopen_right(self):
+        """Test closing tabs to the right is reopened in one batch at the original positions."""
+
+        self.window.views_in_group(0)[6].settings().set('tabs_extra_sticky', True)
+        self.close('right')
+        self.assertEqual(self.names(), ['0', '1', '2', '3', '6'])
+        self.window.run_command('tabs_extra_reopen_closed')
+        self.assertEqual(self.names(), [str(i) for i in range(10)])
+        self.assertEqual(os.path.basename(self.window.active_view().file_name()), '3.txt')
+        self.assertEqual(tabs_extra.CloseJournal.get(self.window), [])
+
+    def test_reopen_sticky_single(self):
+        """Test a closed sticky tab is reopened as sticky and focused."""
+
+        self.window.views_in_group(0)[5].settings().set('tabs_extra_sticky', True)
+        self.close('single', index=5)
+        self.assertEqual(self.names(), ['0', '1', '2', '3', '4', '6', '7', '8', '9'])
+        self.window.run_command('tabs_extra_reopen_closed')
+        view = self.window.views_in_group(0)[5]
+        self.assertIs(self.window.active_view(), view)
+        self.assertTrue(view.settings().get('tabs_extra_sticky'))
+
+    def test_reopen_close_all(self):
+        """Test closing all tabs of every group is reopened in one batch."""
+
+        window = fake_sublime.Window(2)
+        for i, view in enumerate(self.window.views_in_group(0)):
+            window.add_view(fake_sublime.View(view.file_name(), text='text'), i // 5, activate=False)
+        self.window = window
+        self.window.run_command('tabs_extra_close_all')
+        self.assertEqual(self.window.views(), [])
+        self.assertEqual(len(tabs_extra.CloseJournal.get(self.window)), 1)
+
+        self.window.run_command('tabs_extra_reopen_closed')
+        self.assertEqual(self.names(), ['0', '1', '2', '3', '4'])
+        self.assertEqual(
+            [os.path.basename(v.file_name())[:-4] for v in self.window.views_in_group(1)], ['5', '6', '7', '8', '9']
+        )
+
+    def test_panel_and_bound(self):
+        """Test older entries can be picked from the panel and the journal is bounded."""
+
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('close_journal_size', 2)
+        self.close('single', index=0)
+        self.close('single', index=0)
+        self.close('left', index=2)
+        self.assertEqual(self.names(), ['4', '5', '6', '7', '8', '9'])
+        self.assertEqual(len(tabs_extra.CloseJournal.get(self.window)), 2)
+
+        fake_sublime.QUICK_PANEL_SELECTIONS.append(1)
+        self.window.run_command('tabs_extra_reopen_closed', {'show_panel': True})
+        self.assertEqual(fake_sublime.QUICK_PANEL[-1][1][1], '1.txt')
+        self.assertEqual(self.names(), ['1', '4', '5', '6', '7', '8', '9'])
+        # Tabs are reopened at the positions they had when they were closed.
+        self.window.run_command('tabs_extra_reopen_closed')
+        self.assertEqual(self.names(), ['2', '3', '1', '4', '5', '6', '7', '8', '9'])
+        self.window.run_command('tabs_extra_reopen_closed')
+        self.assertEqual(len(self.names()), 9)
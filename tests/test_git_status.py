@@ -0,0 +1,140 @@
+"""Test the git status sort against temporary repositories."""
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from . import fake_sublime
+
+fake_sublime.install()
+
+from TabsExtra import tab_git  # noqa: E402
+from TabsExtra import tab_sort_helper as tsh  # noqa: E402
+from TabsExtra import tabs_extra  # noqa: E402
+
+
+def git(cwd, *args):
+    """Run git in the given folder."""
+
+    subprocess.run(
+        ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', '-c', 'init.defaultBranch=main'] +
+        list(args),
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def write(path, text):
+    """Write a file, creating its folder."""
+
+    folder = os.path.dirname(path)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+@unittest.skipUnless(shutil.which('git'), 'git is not available')
+class TestGitStatus(unittest.TestCase):
+    """Test sorting by git status."""
+
+    def setUp(self):
+        """Create two repositories with files in every state."""
+
+        fake_sublime.reset()
+        tab_git.GitStatusCache.clear()
+        self.tempdir = os.path.realpath(tempfile.mkdtemp())
+        self.repo = os.path.join(self.tempdir, 'repo')
+        self.other = os.path.join(self.tempdir, 'other')
+        os.makedirs(self.repo)
+        os.makedirs(self.other)
+        for repo in (self.repo, self.other):
+            git(repo, 'init', '-q')
+
+        for name in ('clean.txt', 'modified.txt', 'staged.txt', 'conflict.txt', 'sub dir/renamed.txt'):
+            write(self.path(name), 'base\n')
+        git(self.repo, 'add', '-A')
+        git(self.repo, 'commit', '-q', '-m', 'base')
+
+        git(self.repo, 'checkout', '-q', '-b', 'topic')
+        write(self.path('conflict.txt'), 'topic\n')
+        git(self.repo, 'commit', '-q', '-am', 'topic')
+        git(self.repo, 'checkout', '-q', 'main')
+        write(self.path('conflict.txt'), 'main\n')
+        git(self.repo, 'commit', '-q', '-am', 'main')
+        try:
+            git(self.repo, 'merge', '-q', 'topic')
+        except subprocess.CalledProcessError:
+            pass
+
+        write(self.path('modified.txt'), 'changed\n')
+        write(self.path('staged.txt'), 'changed\n')
+        git(self.repo, 'add', 'staged.txt')
+        git(self.repo, 'mv', 'sub dir/renamed.txt', 'sub dir/moved.txt')
+        write(self.path('untracked.txt'), 'new\n')
+
+        write(os.path.join(self.other, 'untracked.txt'), 'new\n')
+        write(os.path.join(self.tempdir, 'outside.txt'), 'outside\n')
+
+    def tearDown(self):
+        """Remove the repositories."""
+
+        shutil.rmtree(self.tempdir)
+
+    def path(self, name):
+        """Get a path in the main repository."""
+
+        return os.path.join(self.repo, *name.split('/'))
+
+    def test_statuses(self):
+        """Test each file gets the right status."""
+
+        files = {
+            self.path('conflict.txt'): tab_git.GIT_CONFLICTED,
+            self.path('modified.txt'): tab_git.GIT_MODIFIED,
+            self.path('staged.txt'): tab_git.GIT_STAGED,
+            self.path('sub dir/moved.txt'): tab_git.GIT_STAGED,
+            self.path('untracked.txt'): tab_git.GIT_UNTRACKED,
+            self.path('clean.txt'): tab_git.GIT_CLEAN,
+            os.path.join(self.other, 'untracked.txt'): tab_git.GIT_UNTRACKED,
+            os.path.join(self.tempdir, 'outside.txt'): tab_git.GIT_NO_REPO
+        }
+        window = fake_sublime.Window()
+        views = [window.add_view(fake_sublime.View(f)) for f in files]
+        views.append(window.add_view(fake_sublime.View(None)))
+        context = tsh.SortContext(window)
+        self.assertEqual(context.git_statuses(views), list(files.values()) + [tab_git.GIT_NO_REPO])
+        self.assertEqual(tab_git.GitStatusCache.stats()['misses'], 2)
+
+    def test_sort(self):
+        """Test sorting a group by git status."""
+
+        window = fake_sublime.Window()
+        for name in ('clean.txt', 'untracked.txt', 'staged.txt', 'modified.txt', 'conflict.txt'):
+            window.add_view(fake_sublime.View(self.path(name)), activate=False)
+        window.add_view(fake_sublime.View(os.path.join(self.tempdir, 'outside.txt')), activate=False)
+        window.run_command('tabs_extra_sort', {'sort_by': 'TabsExtra.sort.git_status'})
+        self.assertEqual(
+            [os.path.basename(v.file_name()) for v in window.views_in_group(0)],
+            ['conflict.txt', 'modified.txt', 'staged.txt', 'untracked.txt', 'clean.txt', 'outside.txt']
+        )
+
+    def test_cache(self):
+        """Test results are reused until the index changes."""
+
+        window = fake_sublime.Window()
+        view = window.add_view(fake_sublime.View(self.path('modified.txt')))
+        self.assertEqual(tsh.SortContext(window).git_statuses([view]), [tab_git.GIT_MODIFIED])
+        self.assertEqual(tsh.SortContext(window).git_statuses([view]), [tab_git.GIT_MODIFIED])
+        self.assertEqual(tab_git.GitStatusCache.stats()['hits'], 1)
+
+        git(self.repo, 'add', 'modified.txt')
+        # Make sure the index's modified time differs even on coarse file systems.
+        os.utime(os.path.join(self.repo, '.git', 'index'), ns=(0, 0))
+        self.assertEqual(tsh.SortContext(window).git_statuses([view]), [tab_git.GIT_STAGED])
+
+        tabs_extra.TabsExtraListener().on_post_save(view)
+        self.assertEqual(tsh.SortContext(window).git_statuses([view]), [tab_git.GIT_STAGED])
+        self.assertEqual(tab_git.GitStatusCache.stats()['misses'], 3)
@@ -0,0 +1,38 @@
+"""Test the generated tab menu."""
+import json
+import unittest
+from . import fake_sublime
+
+fake_sublime.install()
+
+from TabsExtra import tab_menu  # noqa: E402
+from TabsExtra.lib.file_strip.json import sanitize_json  # noqa: E402
+
+
+class TestMenu(unittest.TestCase):
+    """Test the tab menu."""
+
+    def setUp(self):
+        """Reset the settings."""
+
+        fake_sublime.reset()
+
+    def test_sort_entries(self):
+        """Test that sort entries with a list of modules or quoted captions produce valid JSON."""
+
+        fake_sublime.load_settings(tab_menu.SETTINGS).set(
+            'sort_layout',
+            [
+                {"module": "TabsExtra.sort.name", "caption": "Name"},
+                {"module": ["TabsExtra.sort.type", "TabsExtra.sort.modified"], "caption": 'Extension, "Modified"'}
+            ]
+        )
+        menu = json.loads(sanitize_json(tab_menu.get_menu(), True))
+        sort_menu = next(item for item in menu if item.get("caption") == "Sort Tabs By…")
+        self.assertEqual(
+            [(e["args"]["sort_by"], e["caption"]) for e in sort_menu["children"]],
+            [
+                ("TabsExtra.sort.name", "Name"),
+                (["TabsExtra.sort.type", "TabsExtra.sort.modified"], 'Extension, "Modified"')
+            ]
+        )
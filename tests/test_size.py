@@ -0,0 +1,56 @@
+"""Test measuring unsaved buffers for the size sort."""
+import unittest
+from unittest import mock
+from . import fake_sublime
+
+fake_sublime.install()
+
+from TabsExtra import tabs_extra  # noqa: E402
+
+TEXT = 'héllo wörld\n€ line two\n\U0001d11e end\n'
+
+
+class TestBufferSize(unittest.TestCase):
+    """Test that chunked measuring matches encoding the whole buffer."""
+
+    def setUp(self):
+        """Load the size sort with a chunk size smaller than the buffer."""
+
+        fake_sublime.reset()
+        self.size = tabs_extra.load_sort_module('TabsExtra.sort.size')
+        patcher = mock.patch.object(self.size, 'CHUNK_SIZE', 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_encodings(self):
+        """Test the size of a buffer in several encodings and with Unix and Windows line endings."""
+
+        for encoding, codec in (
+            ('UTF-8', 'utf_8'),
+            ('UTF-16 LE', 'utf_16_le'),
+            ('UTF-16 BE with BOM', 'utf_16_be'),
+            ('Western (Windows 1252)', 'cp1252'),
+            ('Western (ISO 8859-1)', 'latin_1'),
+            ('Undefined', 'utf_8')
+        ):
+            for line_endings, text in (('Unix', TEXT), ('Windows', TEXT.replace('\n', '\r\n'))):
+                view = fake_sublime.View(text=TEXT, encoding=encoding, line_endings=line_endings)
+                self.assertEqual(
+                    self.size.buffer_size(view), len(text.encode(codec, 'replace')), (encoding, line_endings)
+                )
+
+    def test_bom(self):
+        """Test that a BOM emitted by the codec is only counted once, however many chunks are encoded."""
+
+        view = fake_sublime.View(text=TEXT)
+        for codec in ('utf_16', 'utf_32', 'utf_8_sig'):
+            self.assertEqual(self.size.encoded_size(view, codec), len(TEXT.encode(codec)), codec)
+
+    def test_approximate(self):
+        """Test that the estimate is exact for text of fixed width characters, without a BOM."""
+
+        text = 'plain ascii text'
+        view = fake_sublime.View(text=text)
+        for codec in ('utf_8', 'utf_16', 'utf_16_le', 'utf_32', 'cp1252'):
+            bom = len(''.encode(codec))
+            self.assertEqual(self.size.approximate_size(view, codec), len(text.encode(codec)) - bom, codec)
@@ -0,0 +1,589 @@
+"""Test the sort command."""
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+from . import fake_sublime
+
+fake_sublime.install()
+
+from TabsExtra import tab_sort_helper  # noqa: E402
+from TabsExtra import tabs_extra  # noqa: E402
+
+
+# A sort module written before sort contexts: `run` only takes the views and the view data.
+LEGACY_SORT = """
+import os
+
+
+def run(views, view_data):
+    for v in views:
+        view_data.append((len(os.path.basename(v.file_name())), v))
+"""
+
+
+class TestSort(unittest.TestCase):
+    """Test sorting."""
+
+    def setUp(self):
+        """Create a window with unsorted tabs."""
+
+        fake_sublime.reset()
+        tab_sort_helper.StatCache.clear()
+        tabs_extra.SortTask.keys.clear()
+        tabs_extra.SortGeneration.clear()
+        tabs_extra.SortKeyWarmer.clear()
+        self.window = fake_sublime.Window()
+        for name in ('c.txt', 'a.txt', 'd.txt', 'b.txt'):
+            self.window.add_view(fake_sublime.View('/missing/%s' % name), activate=False)
+
+    def names(self, group=0):
+        """Get the file names of the group in order."""
+
+        return [v.file_name().split('/')[-1] for v in self.window.views_in_group(group)]
+
+    def sort(self, **kwargs):
+        """Run the sort command."""
+
+        args = {'sort_by': 'TabsExtra.sort.name'}
+        args.update(kwargs)
+        fake_sublime.reset_calls()
+        self.window.run_command('tabs_extra_sort', args)
+
+    def test_sort_name(self):
+        """Test sort by name with minimal moves."""
+
+        self.sort()
+        self.assertEqual(self.names(), ['a.txt', 'b.txt', 'c.txt', 'd.txt'])
+        self.assertEqual(fake_sublime.CALLS['Window.set_view_index'], 2)
+
+    def test_sort_reverse(self):
+        """Test reverse sort."""
+
+        self.sort(reverse=True)
+        self.assertEqual(self.names(), ['d.txt', 'c.txt', 'b.txt', 'a.txt'])
+
+    def test_composite(self):
+        """Test a composite sort."""
+
+        self.window.add_view(fake_sublime.View('/missing/a.md'), activate=False)
+        self.sort(sort_by=['TabsExtra.sort.type', 'TabsExtra.sort.name'])
+        self.assertEqual(self.names(), ['a.md', 'a.txt', 'b.txt', 'c.txt', 'd.txt'])
+
+    def test_legacy_module(self):
+        """Test that modules whose `run` doesn't take a sort context work, alone and combined."""
+
+        fake_sublime.RESOURCES['Packages/User/legacy_sort.py'] = LEGACY_SORT
+        self.addCleanup(tabs_extra.SortModuleCache.clear)
+        for name in ('ee.txt', 'f.md'):
+            self.window.add_view(fake_sublime.View('/missing/%s' % name), activate=False)
+
+        self.sort(sort_by='User.legacy_sort')
+        self.assertEqual(self.names(), ['f.md', 'c.txt', 'a.txt', 'd.txt', 'b.txt', 'ee.txt'])
+        self.sort(sort_by=['User.legacy_sort', 'TabsExtra.sort.name'])
+        self.assertEqual(self.names(), ['f.md', 'a.txt', 'b.txt', 'c.txt', 'd.txt', 'ee.txt'])
+
+    def test_sort_module_cache(self):
+        """Test that sort modules are only compiled again when their source changes, and unloading clears them."""
+
+        cache = tabs_extra.SortModuleCache
+        cache.clear()
+        fake_sublime.RESOURCES['Packages/User/cached_sort.py'] = 'VERSION = 1\n'
+        module = cache.get('User.cached_sort')
+        self.assertIs(cache.get('User.cached_sort'), module)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'size': 1})
+
+        fake_sublime.RESOURCES['Packages/User/cached_sort.py'] = 'VERSION = 2\n'
+        self.assertEqual(cache.get('User.cached_sort').VERSION, 2)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 2, 'size': 1})
+
+        tabs_extra.plugin_unloaded()
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 0, 'size': 0})
+        self.assertNotIn('User.cached_sort', sys.modules)
+
+    def test_composite_ties(self):
+        """Test that later modules of a composite sort break the ties of earlier ones."""
+
+        tempdir = tempfile.mkdtemp()
+        try:
+            window = fake_sublime.Window()
+            for name, mtime in (('c.py', 3), ('a.py', 2), ('b.py', 1), ('d.md', 4)):
+                path = os.path.join(tempdir, name)
+                with open(path, 'w') as f:
+                    f.write(name)
+                os.utime(path, (mtime, mtime))
+                window.add_view(fake_sublime.View(path), activate=False)
+            window.run_command('tabs_extra_sort', {'sort_by': ['TabsExtra.sort.type', 'TabsExtra.sort.modified']})
+            self.assertEqual(
+                [os.path.basename(v.file_name()) for v in window.views_in_group(0)], ['d.md', 'b.py', 'a.py', 'c.py']
+            )
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_skip_unchanged(self):
+        """Test that a sort is skipped when nothing changed."""
+
+        self.sort(skip_unchanged=True)
+        self.sort(skip_unchanged=True)
+        self.assertEqual(fake_sublime.CALLS['View.file_name'], 0)
+        self.assertEqual(fake_sublime.CALLS['Window.set_view_index'], 0)
+
+        view = self.window.views_in_group(0)[0]
+        tabs_extra.SortGeneration.bump_view(view, 'load')
+        self.sort(skip_unchanged=True)
+        self.assertNotEqual(fake_sublime.CALLS['View.file_name'], 0)
+
+    def test_modified_invalidates(self):
+        """Test that edits invalidate sorts that depend on them, but not other sorts."""
+
+        view = self.window.views_in_group(0)[0]
+        for module, skipped in (('TabsExtra.sort.modified', False), ('TabsExtra.sort.name', True)):
+            self.sort(sort_by=module, skip_unchanged=True)
+            fake_sublime.fire('on_modified', view)
+            self.sort(sort_by=module, skip_unchanged=True)
+            self.assertEqual(fake_sublime.CALLS['View.file_name'] == 0, skipped)
+
+    def test_resort_after_rename(self):
+        """Test that a renamed file is sorted again, automatically after a save and always when asked."""
+
+        self.sort()
+        view = self.window.views_in_group(0)[0]
+        view.retarget('/missing/z.txt')
+        self.sort()
+        self.assertEqual(self.names(), ['b.txt', 'c.txt', 'd.txt', 'z.txt'])
+
+        view.retarget('/missing/a.txt')
+        fake_sublime.fire('on_post_save', view)
+        self.sort(skip_unchanged=True)
+        self.assertEqual(self.names(), ['a.txt', 'b.txt', 'c.txt', 'd.txt'])
+
+    def test_skip_after_save(self):
+        """Test that a save only invalidates name sorts if it changes the file name."""
+
+        view = self.window.views_in_group(0)[0]
+        fake_sublime.fire('on_load', view)
+        self.sort(skip_unchanged=True)
+        fake_sublime.fire('on_post_save', view)
+        self.sort(skip_unchanged=True)
+        self.assertEqual(fake_sublime.CALLS['View.file_name'], 0)
+
+        view.retarget('/missing/z.txt')
+        fake_sublime.fire('on_post_save', view)
+        self.sort(skip_unchanged=True)
+        self.assertEqual(self.names(), ['a.txt', 'b.txt', 'd.txt', 'z.txt'])
+
+    def test_resort_after_syntax_change(self):
+        """Test that syntax sorts are never skipped since syntax changes raise no event."""
+
+        syntaxes = ['Python', 'Java', 'Zed', 'Java']
+        for view, syntax in zip(self.window.views_in_group(0), syntaxes):
+            view.assign_syntax(syntax)
+        self.sort(sort_by='TabsExtra.sort.syntax', skip_unchanged=True)
+        self.window.views_in_group(0)[0].assign_syntax('Zz')
+        self.sort(sort_by='TabsExtra.sort.syntax', skip_unchanged=True)
+        self.assertEqual(
+            [v.settings().get('syntax') for v in self.window.views_in_group(0)], ['Java', 'Python', 'Zed', 'Zz']
+        )
+
+    def test_incremental(self):
+        """Test that a single new view is placed with one move."""
+
+        self.sort()
+        view = self.window.add_view(fake_sublime.View('/missing/bb.txt'), activate=False)
+        self.sort(view_id=view.id())
+        self.assertEqual(self.names(), ['a.txt', 'b.txt', 'bb.txt', 'c.txt', 'd.txt'])
+        self.assertEqual(fake_sublime.CALLS['Window.set_view_index'], 1)
+        self.assertEqual(fake_sublime.CALLS['View.is_dirty'], 1)
+
+    def test_incremental_unsaved(self):
+        """Test that placing a file that isn't on disk agrees with a full sort by time."""
+
+        for module in ('TabsExtra.sort.modified', 'TabsExtra.sort.created'):
+            self.sort(sort_by=module)
+            view = self.window.add_view(fake_sublime.View('/missing/bb.txt'), activate=False)
+            self.sort(sort_by=module, view_id=view.id())
+            self.assertEqual(self.names(), ['a.txt', 'b.txt', 'bb.txt', 'c.txt', 'd.txt'])
+            self.assertEqual(fake_sublime.CALLS['Window.set_view_index'], 1)
+            view.close()
+
+    def test_incremental_stale_keys(self):
+        """Test that a saved view is only placed with the cached keys if no other view changed since."""
+
+        tempdir = tempfile.mkdtemp()
+        try:
+            window = fake_sublime.Window()
+            for index, name in enumerate(('a.txt', 'b.txt', 'c.txt', 'd.txt')):
+                path = os.path.join(tempdir, name)
+                with open(path, 'w') as f:
+                    f.write(name)
+                os.utime(path, (index, index))
+                window.add_view(fake_sublime.View(path), activate=False)
+            settings = fake_sublime.load_settings(tabs_extra.SETTINGS)
+            settings.set('sort_on_load_save', True)
+            settings.set('sort_on_load_save_delay', 0)
+            settings.set('sort_on_load_save_command', {'module': 'TabsExtra.sort.modified'})
+            window.run_command('tabs_extra_sort', {'sort_by': 'TabsExtra.sort.modified'})
+
+            b, c = window.views_in_group(0)[1:3]
+            b._dirty = True
+            fake_sublime.fire('on_modified', b)
+            os.utime(c.file_name(), (10, 10))
+            fake_sublime.fire('on_post_save', c)
+            names = [os.path.basename(v.file_name()) for v in window.views_in_group(0)]
+            self.assertEqual(names, ['a.txt', 'd.txt', 'c.txt', 'b.txt'])
+
+            a = window.views_in_group(0)[0]
+            os.utime(a.file_name(), (20, 20))
+            fake_sublime.reset_calls()
+            fake_sublime.fire('on_post_save', a)
+            names = [os.path.basename(v.file_name()) for v in window.views_in_group(0)]
+            self.assertEqual(names, ['d.txt', 'c.txt', 'a.txt', 'b.txt'])
+            self.assertEqual(fake_sublime.CALLS['View.is_dirty'], 1)
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_sort_on_load_coalesced(self):
+        """Test that several tabs loading in one group within the delay cause a single sort."""
+
+        settings = fake_sublime.load_settings(tabs_extra.SETTINGS)
+        settings.set('sort_on_load_save', True)
+        settings.set('sort_on_load_save_delay', 100)
+        settings.set('sort_on_load_save_command', {'module': 'TabsExtra.sort.name'})
+        self.addCleanup(tabs_extra.SortScheduler.cancel)
+        fake_sublime.DEFER.add('timeout')
+        run_command = mock.patch.object(self.window, 'run_command', wraps=self.window.run_command).start()
+        self.addCleanup(mock.patch.stopall)
+
+        for view in self.window.views_in_group(0):
+            fake_sublime.fire('on_load', view)
+        self.assertEqual(run_command.call_count, 0)
+        self.assertEqual(self.names(), ['c.txt', 'a.txt', 'd.txt', 'b.txt'])
+
+        # Only the timer of the last load sorts; the earlier ones were superseded.
+        flushes = [c for c in fake_sublime.TIMEOUT_QUEUE if getattr(c, 'func', None) == tabs_extra.SortScheduler.flush]
+        self.assertEqual(len(flushes), 4)
+        for flush in flushes[:-1]:
+            flush()
+        self.assertEqual(run_command.call_count, 0)
+        flushes[-1]()
+        fake_sublime.run_queued(fake_sublime.TIMEOUT_QUEUE)
+        sorts = [args for cmd, args in (c[0] for c in run_command.call_args_list) if cmd == 'tabs_extra_sort']
+        self.assertEqual(len(sorts), 1)
+        self.assertNotIn('view_id', sorts[0])
+        self.assertEqual(self.names(), ['a.txt', 'b.txt', 'c.txt', 'd.txt'])
+
+    def test_sort_on_activated(self):
+        """Test that a tab loaded before it is in a group is sorted when it is first activated."""
+
+        self.sort()
+        settings = fake_sublime.load_settings(tabs_extra.SETTINGS)
+        settings.set('sort_on_load_save', True)
+        settings.set('sort_on_load_save_delay', 100)
+        settings.set('sort_on_load_save_command', {'module': 'TabsExtra.sort.name'})
+        self.addCleanup(tabs_extra.SortScheduler.cancel)
+        fake_sublime.DEFER.add('timeout')
+
+        view = fake_sublime.View('/missing/bb.txt')
+        fake_sublime.fire('on_load', view)
+        self.assertTrue(view.settings().get('tabsextra_to_sort'))
+        fake_sublime.run_queued(fake_sublime.TIMEOUT_QUEUE)
+
+        self.window.add_view(view)
+        fake_sublime.fire('on_activated', view)
+        self.assertFalse(view.settings().has('tabsextra_to_sort'))
+        self.assertEqual(self.names(), ['a.txt', 'b.txt', 'c.txt', 'd.txt', 'bb.txt'])
+        fake_sublime.run_queued(fake_sublime.TIMEOUT_QUEUE)
+        self.assertEqual(self.names(), ['a.txt', 'b.txt', 'bb.txt', 'c.txt', 'd.txt'])
+
+    def test_scope_window(self):
+        """Test sorting every group of the window."""
+
+        window = fake_sublime.Window(2)
+        for group, names in enumerate((('b', 'a'), ('d', 'c'))):
+            for name in names:
+                window.add_view(fake_sublime.View('/missing/%s' % name), group, activate=False)
+        window.run_command('tabs_extra_sort', {'sort_by': 'TabsExtra.sort.name', 'scope': 'window'})
+        self.assertEqual([v.file_name() for v in window.views_in_group(0)], ['/missing/a', '/missing/b'])
+        self.assertEqual([v.file_name() for v in window.views_in_group(1)], ['/missing/c', '/missing/d'])
+
+    def test_superseded_sort(self):
+        """Test that a newer sort of a group cancels the one still computing."""
+
+        fake_sublime.DEFER.update(('async', 'timeout'))
+        self.sort(reverse=True)
+        self.sort()
+        # The older sort stops computing and never schedules its moves.
+        fake_sublime.ASYNC_QUEUE.pop(0)()
+        self.assertEqual(fake_sublime.TIMEOUT_QUEUE, [])
+
+        fake_sublime.run_queued(fake_sublime.ASYNC_QUEUE)
+        fake_sublime.reset_calls()
+        self.assertEqual(fake_sublime.run_queued(fake_sublime.TIMEOUT_QUEUE), 1)
+        self.assertEqual(self.names(), ['a.txt', 'b.txt', 'c.txt', 'd.txt'])
+        self.assertEqual(fake_sublime.CALLS['Window.set_view_index'], 2)
+
+    def test_partly_superseded_sort(self):
+        """Test that a sort that lost some of its groups to a newer sort still sorts the rest."""
+
+        window = fake_sublime.Window(2)
+        for group, names in enumerate((('b', 'a', 'c'), ('e', 'd', 'f'))):
+            for name in names:
+                window.add_view(fake_sublime.View('/missing/%s' % name), group, activate=False)
+
+        fake_sublime.DEFER.add('async')
+        window.run_command('tabs_extra_sort', {'sort_by': 'TabsExtra.sort.name', 'scope': 'window', 'reverse': True})
+        window.run_command('tabs_extra_sort', {'sort_by': 'TabsExtra.sort.name', 'group': 1})
+        fake_sublime.run_queued(fake_sublime.ASYNC_QUEUE)
+        self.assertEqual([v.file_name()[9:] for v in window.views_in_group(0)], ['c', 'b', 'a'])
+        self.assertEqual([v.file_name()[9:] for v in window.views_in_group(1)], ['d', 'e', 'f'])
+
+    def test_scope_all_windows_focus(self):
+        """Test that the window that sorted every window is refocused last."""
+
+        other = fake_sublime.Window()
+        other.add_view(fake_sublime.View('/missing/z.txt'))
+        focused = []
+        focus_view = fake_sublime.Window.focus_view
+
+        def record(window, view):
+            """Record the focused window."""
+
+            focused.append(window)
+            focus_view(window, view)
+
+        fake_sublime.Window.focus_view = record
+        try:
+            self.sort(scope='all_windows')
+        finally:
+            fake_sublime.Window.focus_view = focus_view
+        self.assertEqual(focused, [other, self.window])
+
+    def test_warmed_keys(self):
+        """Test that warmed keys are used and dropped when a view changes."""
+
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('sort_key_warming', True)
+        tabs_extra.SortKeyWarmer.warm(tabs_extra.SortKeyWarmer.generation)
+
+        self.sort()
+        self.assertEqual(self.names(), ['a.txt', 'b.txt', 'c.txt', 'd.txt'])
+        self.assertEqual(fake_sublime.CALLS['View.is_dirty'], 0)
+
+        view = self.window.views_in_group(0)[0]
+        view._file_name = '/missing/e.txt'
+        tabs_extra.SortKeyWarmer.invalidate(view)
+        tabs_extra.SortGeneration.bump_view(view, 'load')
+        self.sort()
+        self.assertEqual(self.names(), ['b.txt', 'c.txt', 'd.txt', 'e.txt'])
+        stats = tabs_extra.SortKeyWarmer.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (7, 1))
+
+    def test_warmed_keys_invalidated_while_computing(self):
+        """Test that keys of a view that changed while they were computed are not cached."""
+
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('sort_key_warming', True)
+        name = tabs_extra.load_sort_module('TabsExtra.sort.name')
+
+        def run(views, view_data, context):
+            """Sort by name and edit the first view in the middle of the run."""
+
+            name.run(views, view_data, context)
+            fake_sublime.fire('on_modified', views[0])
+
+        views = self.window.views_in_group(0)
+        context = tab_sort_helper.SortContext(self.window)
+        view_data = []
+        tabs_extra.SortKeyWarmer.gather('edited', types.SimpleNamespace(run=run), views, view_data, context)
+        self.assertEqual(len(view_data), 4)
+        keys = tabs_extra.SortKeyWarmer.keys[tabs_extra.SortKeyWarmer.cache_key('edited', context)]
+        self.assertEqual(sorted(keys), sorted(v.id() for v in views[1:]))
+
+    def test_project_path(self):
+        """Test sorting by path relative to the project folders."""
+
+        window = fake_sublime.Window(folders=['/proj', '/proj/sub', '/other'])
+        for pth in (
+            '/elsewhere/a.txt', '/proj/a-b/a.txt', '/other/x/a.txt', '/proj/a/b/a.txt',
+            '/proj/sub/a.txt', '/proj/a.txt'
+        ):
+            window.add_view(fake_sublime.View(pth), activate=False)
+        window.add_view(fake_sublime.View(None), activate=False)
+        window.run_command('tabs_extra_sort', {'sort_by': 'TabsExtra.sort.project_path'})
+        self.assertEqual(
+            [v.file_name() for v in window.views_in_group(0)],
+            [
+                '/proj/a.txt', '/proj/a/b/a.txt', '/proj/a-b/a.txt', '/proj/sub/a.txt',
+                '/other/x/a.txt', '/elsewhere/a.txt', None
+            ]
+        )
+
+    def test_project_folder(self):
+        """Test sorting by project folder."""
+
+        window = fake_sublime.Window(folders=['/b', '/a', '/a/sub'])
+        for pth in ('/z/a.txt', '/a/sub/a.txt', '/a/y.txt', '/b/z/a.txt', '/a/x.txt', '/b/a.txt'):
+            window.add_view(fake_sublime.View(pth), activate=False)
+        window.add_view(fake_sublime.View(None), activate=False)
+        window.run_command('tabs_extra_sort', {'sort_by': 'TabsExtra.sort.project_folder'})
+        self.assertEqual(
+            [v.file_name() for v in window.views_in_group(0)],
+            ['/b/a.txt', '/b/z/a.txt', '/a/x.txt', '/a/y.txt', '/a/sub/a.txt', '/z/a.txt', None]
+        )
+
+    def test_project_folder_all_windows(self):
+        """Test that each window is sorted against its own project folders."""
+
+        windows = [fake_sublime.Window(folders=['/p1a', '/p1b']), fake_sublime.Window(folders=['/p2b', '/p2a'])]
+        for window, prefix in zip(windows, ('/p1', '/p2')):
+            for pth in ('%sa/a.txt' % prefix, '%sb/b.txt' % prefix):
+                window.add_view(fake_sublime.View(pth), activate=False)
+        self.window.run_command(
+            'tabs_extra_sort', {'sort_by': 'TabsExtra.sort.project_folder', 'scope': 'all_windows'}
+        )
+        self.assertEqual([v.file_name() for v in windows[0].views_in_group(0)], ['/p1a/a.txt', '/p1b/b.txt'])
+        self.assertEqual([v.file_name() for v in windows[1].views_in_group(0)], ['/p2b/b.txt', '/p2a/a.txt'])
+
+    def test_live_mru(self):
+        """Test that activated tabs are moved to the front after sticky tabs once activation settles."""
+
+        fake_sublime.load_settings(tabs_extra.SETTINGS).set('live_mru_order', True)
+        views = self.window.views_in_group(0)
+        views[0].settings().set('tabs_extra_sticky', True)
+
+        queued = []
+        set_timeout = tabs_extra.sublime.set_timeout
+        tabs_extra.sublime.set_timeout = lambda callback, delay=0: queued.append(callback)
+        try:
+            for view in views[1:]:
+                self.window.focus_view(view)
+            fake_sublime.reset_calls()
+            for callback in queued:
+                callback()
+        finally:
+            tabs_extra.sublime.set_timeout = set_timeout
+
+        self.assertEqual(self.names(), ['c.txt', 'b.txt', 'a.txt', 'd.txt'])
+        self.assertEqual(fake_sublime.CALLS['Window.set_view_index'], 1)
+
+        self.window.focus_view(views[0])
+        self.assertEqual(self.names(), ['c.txt', 'b.txt', 'a.txt', 'd.txt'])
+
+    def layout(self, views, **kwargs):
+        """Run the layout command on a two group window containing the given files."""
+
+        window = fake_sublime.Window(2)
+        for group, names in enumerate(views):
+            for name in names:
+                window.add_view(fake_sublime.View(name and '/proj/%s' % name), group, activate=False)
+        fake_sublime.reset_calls()
+        window.run_command('tabs_extra_layout', kwargs)
+        return [[v.file_name() and v.file_name()[6:] for v in window.views_in_group(g)] for g in range(2)]
+
+    def test_layout_even(self):
+        """Test splitting tabs evenly across groups."""
+
+        self.assertEqual(
+            self.layout([['e', 'a', 'c'], ['b', 'd']]),
+            [['a', 'b', 'c'], ['d', 'e']]
+        )
+        self.assertEqual(fake_sublime.CALLS['Window.set_view_index'], 2)
+
+    def test_layout_key(self):
+        """Test giving each extension its own group."""
+
+        self.assertEqual(
+            self.layout([['b.py', 'a.md'], ['a.py', 'c.txt']], sort_by='TabsExtra.sort.type', partition='key'),
+            [['a.md'], ['a.py', 'b.py', 'c.txt']]
+        )
+
+    def test_layout_rules(self):
+        """Test distributing tabs by glob rules."""
+
+        self.assertEqual(
+            self.layout(
+                [['test_b.py', 'a.py', None], ['x.json', 'test_a.py']],
+                partition='rules',
+                rules=[{'group': 1, 'patterns': ['test_*.py', 'tests/*']}, {'group': 0, 'patterns': ['*.py']}]
+            ),
+            [[None, 'a.py'], ['test_a.py', 'test_b.py', 'x.json']]
+        )
+        self.assertEqual(
+            self.layout([['b.json', 'a.py'], []], partition='rules', rules=[{'group': 1, 'patterns': ['*.py']}],
+                        default_group=0),
+            [['b.json'], ['a.py']]
+        )
+
+    def test_layout_overlapping_runs(self):
+        """Test that a layout started before an earlier one finishes doesn't change the earlier one's rules."""
+
+        window = fake_sublime.Window(2)
+        for name in ('a.py', 'b.json'):
+            window.add_view(fake_sublime.View('/proj/%s' % name), activate=False)
+        command = tabs_extra.TabsExtraLayoutCommand(window)
+
+        queued = []
+        set_timeout_async = tabs_extra.sublime.set_timeout_async
+        tabs_extra.sublime.set_timeout_async = lambda callback, delay=0: queued.append(callback)
+        try:
+            command.run(partition='rules', rules=[{'group': 1, 'patterns': ['*.py']}])
+            command.run(partition='rules', rules=[{'group': 1, 'patterns': ['*.json']}])
+        finally:
+            tabs_extra.sublime.set_timeout_async = set_timeout_async
+
+        queued.pop(0)()
+        self.assertEqual(
+            [[v.file_name()[6:] for v in window.views_in_group(g)] for g in range(2)],
+            [['b.json'], ['a.py']]
+        )
+
+        fake_sublime.reset_calls()
+        queued.pop(0)()
+        self.assertEqual(fake_sublime.CALLS['Window.set_view_index'], 0)
+
+    def test_watch_sort(self):
+        """Test that groups are re-sorted once files stop changing on disk."""
+
+        tempdir = tempfile.mkdtemp()
+        try:
+            window = fake_sublime.Window()
+            for index, name in enumerate(('a.txt', 'b.txt', 'c.txt')):
+                path = os.path.join(tempdir, name)
+                with open(path, 'w') as f:
+                    f.write(name)
+                os.utime(path, (index, index))
+                window.add_view(fake_sublime.View(path), activate=False)
+            window.run_command('tabs_extra_sort', {'sort_by': 'TabsExtra.sort.modified'})
+
+            queued = []
+            set_timeout_async = tabs_extra.sublime.set_timeout_async
+
+            def queue_ticks(callback, delay=0):
+                """Queue the watcher's checks instead of looping forever."""
+
+                if getattr(callback, 'func', None) == tabs_extra.SortWatcher.tick:
+                    queued.append(callback)
+                else:
+                    set_timeout_async(callback, delay)
+
+            tabs_extra.sublime.set_timeout_async = queue_ticks
+            fake_sublime.load_settings(tabs_extra.SETTINGS).set('watch_sort', True)
+            try:
+                tabs_extra.SortWatcher.refresh()
+                queued.pop(0)()
+                os.utime(os.path.join(tempdir, 'a.txt'), (10, 10))
+                queued.pop(0)()
+                self.assertEqual([os.path.basename(v.file_name()) for v in window.views_in_group(0)][0], 'a.txt')
+                fake_sublime.reset_calls()
+                queued.pop(0)()
+            finally:
+                tabs_extra.SortWatcher.stop()
+                tabs_extra.sublime.set_timeout_async = set_timeout_async
+
+            self.assertEqual(
+                [os.path.basename(v.file_name()) for v in window.views_in_group(0)], ['b.txt', 'c.txt', 'a.txt']
+            )
+            self.assertEqual(fake_sublime.CALLS['Window.set_view_index'], 1)
+        finally:
+            shutil.rmtree(tempdir)
@@ -0,0 +1,215 @@
+"""Test sort helpers."""
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+from . import fake_sublime
+
+fake_sublime.install()
+
+from TabsExtra import tab_sort_helper as tsh  # noqa: E402
+# Importing the plugin registers its event listeners.
+from TabsExtra import tabs_extra  # noqa: E402,F401
+
+
+class TestMinimalMoves(unittest.TestCase):
+    """Test minimal move calculation."""
+
+    def apply(self, order):
+        """Apply the moves to the current order and return the result."""
+
+        current = list(range(len(order)))
+        moves = tsh.minimal_moves(order)
+        for index, dest in moves:
+            current.remove(index)
+            current.insert(dest, index)
+        return current, moves
+
+    def test_random_orders(self):
+        """Test that random orders are realized with the fewest moves."""
+
+        rand = random.Random(0)
+        for size in range(0, 30):
+            for _ in range(20):
+                order = list(range(size))
+                rand.shuffle(order)
+                current, moves = self.apply(order)
+                self.assertEqual(current, order)
+                self.assertEqual(len(moves), size - len(tsh.longest_increasing_subsequence(order)))
+
+    def test_single_misplaced(self):
+        """Test that one misplaced tab only needs one move."""
+
+        order = list(range(1, 300)) + [0]
+        current, moves = self.apply(order)
+        self.assertEqual(current, order)
+        self.assertEqual(moves, [(0, 299)])
+
+
+class TestNaturalKey(unittest.TestCase):
+    """Test natural sort keys."""
+
+    def test_numeric_order(self):
+        """Test numbers are sorted numerically."""
+
+        self.assertEqual(
+            sorted(['test12', 'test2', 'test1'], key=tsh.natural_key),
+            ['test1', 'test2', 'test12']
+        )
+
+    def test_mixed_keys_compare(self):
+        """Test that keys with leading numbers and leading text compare."""
+
+        self.assertEqual(sorted(['a1', '1a', 'a', '10', ''], key=tsh.natural_key), ['', '1a', '10', 'a', 'a1'])
+
+    def test_batch(self):
+        """Test batch keys match single keys."""
+
+        names = ['file10.txt', 'file9.txt']
+        self.assertEqual(tsh.natural_keys(names), [tsh.natural_key(n) for n in names])
+        self.assertEqual(tsh.natural_keys(names, False), names)
+
+
+class TestStatCache(unittest.TestCase):
+    """Test the shared stat cache."""
+
+    def setUp(self):
+        """Create a file and clear the cache."""
+
+        fake_sublime.reset()
+        tsh.StatCache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'a.txt')
+        self.write('a')
+
+    def tearDown(self):
+        """Remove the file."""
+
+        tsh.StatCache.clear()
+        self.tmp.cleanup()
+
+    def write(self, text):
+        """Write the file."""
+
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def test_hits_and_expiry(self):
+        """Test that entries are reused until they expire, and the hit rate is reported."""
+
+        with mock.patch.object(tsh.time, 'monotonic', return_value=100.0) as monotonic:
+            self.assertEqual(tsh.StatCache.get(self.path).size, 1)
+            self.write('abc')
+            self.assertEqual(tsh.StatCache.get(self.path).size, 1)
+            self.assertEqual(tsh.StatCache.stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'size': 1})
+
+            monotonic.return_value = 102.0
+            self.assertEqual(tsh.StatCache.get(self.path).size, 3)
+            self.assertEqual(tsh.StatCache.stats()['misses'], 2)
+
+            monotonic.return_value = 104.0
+            tsh.StatCache.prune()
+            self.assertEqual(tsh.StatCache.stats()['size'], 0)
+
+    def test_invalidated_on_load_and_save(self):
+        """Test that loading or saving a file drops its entry."""
+
+        window = fake_sublime.Window()
+        view = window.add_view(fake_sublime.View(self.path))
+        for event in ('on_load', 'on_post_save'):
+            tsh.StatCache.get(self.path)
+            self.assertEqual(tsh.StatCache.stats()['size'], 1)
+            fake_sublime.fire(event, view)
+            self.assertEqual(tsh.StatCache.stats()['size'], 0)
+
+
+class TestPathComponents(unittest.TestCase):
+    """Test path component keys."""
+
+    def test_components(self):
+        """Test paths are split into interned, lowercased component keys."""
+
+        self.assertEqual(tsh.path_components('/A/b10\\c', False), ('a', 'b10', 'c'))
+        self.assertEqual(tsh.path_components('/a/b10', True), (('a',), ('b', 10, '')))
+        self.assertLess(tsh.path_components('/a/b'), tsh.path_components('/a-b'))
+        self.assertIs(tsh.path_components('/x/shared', False)[1], tsh.path_components('/y/shared', False)[1])
+
+
+class TestFolderIndex(unittest.TestCase):
+    """Test the project folder prefix index."""
+
+    def test_innermost(self):
+        """Test the innermost containing folder is found."""
+
+        index = tsh.FolderIndex(['/a', '/a/b', '/a/b0', '/c', '/a/b/d/'])
+        self.assertEqual(index.find('/a/b/x.txt'), (1, 'x.txt'))
+        self.assertEqual(index.find('/a/bz/x.txt'), (0, 'bz/x.txt'))
+        self.assertEqual(index.find('/a/b/d/e/x.txt'), (4, 'e/x.txt'))
+        self.assertEqual(index.find('/a/b0'), (2, ''))
+        self.assertEqual(index.find('/ab/x.txt'), (None, '/ab/x.txt'))
+        self.assertEqual(index.find('/d/x.txt'), (None, '/d/x.txt'))
+
+    @staticmethod
+    def random_path(rand, names, depth):
+        """Create a random absolute path."""
+
+        return '/' + '/'.join(rand.choice(names) for _ in range(rand.randint(1, depth)))
+
+    def test_matches_linear_scan(self):
+        """Test the index agrees with a linear scan over random folders."""
+
+        rand = random.Random(0)
+        names = ['a', 'b', 'a-b', 'a0', 'ab']
+        for _ in range(50):
+            folders = [self.random_path(rand, names, 3) for _ in range(rand.randint(1, 15))]
+            index = tsh.FolderIndex(folders)
+            for _ in range(50):
+                path = self.random_path(rand, names, 4)
+                best = None
+                for i, folder in enumerate(folders):
+                    if (path + '/').startswith(folder + '/') and (best is None or len(folder) > len(folders[best])):
+                        best = i
+                self.assertEqual(index.find(path)[0], best)
+
+
+class TestLayoutMoves(unittest.TestCase):
+    """Test cross group move planning."""
+
+    def apply(self, current, target):
+        """Apply the planned moves and return the result."""
+
+        groups = [list(items) for items in current]
+        moves = tsh.layout_moves(current, target)
+        for item, group, index in moves:
+            for items in groups:
+                if item in items:
+                    items.remove(item)
+            groups[group].insert(index, item)
+        return groups, moves
+
+    def test_random_layouts(self):
+        """Test that random layouts are realized, moving each item at most once."""
+
+        rand = random.Random(0)
+        for _ in range(300):
+            count = rand.randint(1, 4)
+            items = list(range(rand.randint(0, 40)))
+            current = [[] for _ in range(count)]
+            target = [[] for _ in range(count)]
+            for item in items:
+                current[rand.randrange(count)].append(item)
+            rand.shuffle(items)
+            for item in items:
+                target[rand.randrange(count)].append(item)
+            groups, moves = self.apply(current, target)
+            self.assertEqual(groups, target)
+            self.assertEqual(len(set(m[0] for m in moves)), len(moves))
+
+    def test_minimal(self):
+        """Test that items already in place are not moved."""
+
+        current = [[0, 1, 2, 3], [4, 5]]
+        target = [[0, 2, 3], [4, 1, 5]]
+        self.assertEqual(self.apply(current, target), (target, [(1, 1, 1)]))
+        self.assertEqual(tsh.layout_moves(target, target), [])
@@ -0,0 +1,82 @@
+"""Test the file watchers."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from . import fake_sublime
+
+fake_sublime.install()
+
+from TabsExtra import tab_sort_helper  # noqa: E402
+from TabsExtra import tab_watch  # noqa: E402
+
+
+class TestFileWatcher(unittest.TestCase):
+    """Test the file watchers."""
+
+    def setUp(self):
+        """Create files to watch."""
+
+        tab_sort_helper.StatCache.clear()
+        self.tempdir = tempfile.mkdtemp()
+        self.files = []
+        for folder in ('a', 'b'):
+            os.makedirs(os.path.join(self.tempdir, folder))
+            for name in ('1.txt', '2.txt'):
+                path = os.path.join(self.tempdir, folder, name)
+                with open(path, 'w') as f:
+                    f.write('text')
+                self.files.append(path)
+
+    def tearDown(self):
+        """Remove the files."""
+
+        shutil.rmtree(self.tempdir)
+
+    def change(self, path):
+        """Rewrite a file and give it a new modified time."""
+
+        with open(path, 'w') as f:
+            f.write('changed')
+        os.utime(path, (0, 0))
+
+    def check(self, watcher):
+        """Check that the watcher reports changes to watched files only."""
+
+        watcher.watch(self.files[:3])
+        self.assertEqual(watcher.poll(), set())
+        self.change(self.files[0])
+        self.change(self.files[3])
+        self.assertEqual(watcher.poll(), {self.files[0]})
+        self.assertEqual(watcher.poll(), set())
+        watcher.close()
+
+    def test_polling(self):
+        """Test the polling watcher."""
+
+        self.check(tab_watch.FileWatcher(use_inotify=False))
+
+    def test_polling_batches(self):
+        """Test that polling checks a bounded number of files per poll."""
+
+        watcher = tab_watch.PollingWatcher(batch=2)
+        watcher.watch(self.files)
+        self.change(self.files[3])
+        self.assertEqual(watcher.poll(), set())
+        self.assertEqual(watcher.poll(), {self.files[3]})
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is only available on Linux')
+    def test_inotify(self):
+        """Test the inotify watcher, with files beyond the watch limit polled."""
+
+        watcher = tab_watch.FileWatcher(max_watches=1)
+        self.assertIsNotNone(watcher.inotify)
+        self.check(watcher)
+
+        watcher = tab_watch.FileWatcher(max_watches=1)
+        watcher.watch(self.files[:3])
+        self.assertEqual(watcher.stats(), {'folders': 1, 'polled': 1})
+        self.change(self.files[2])
+        self.assertEqual(watcher.poll(), {self.files[2]})
+        watcher.close()